@@ -0,0 +1,83 @@
+# benchmarks/import_budget.py
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds allowed for importing each entry point in a fresh interpreter,
+# on top of the time numpy alone takes to import on the same machine,
+# and the heavy dependencies that must still be unloaded afterwards.
+HEAVY = ("qiskit", "qiskit_aer", "skimage", "scipy", "matplotlib")
+BUDGETS = {
+    "core.qkd": 0.15,
+    "multichannel.manager": 0.15,
+    "multichannel.key_pool": 0.15,
+    "metrics.quantum_metrics": 0.2,
+    "metrics.image_metrics": 0.2,
+    "crypto.encryption": 0.1,
+    "stego.lsb": 0.15,
+    "pipeline.async_pipeline": 0.25
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module, repeat=3):
+    """
+    Median import time of `module` over `repeat` fresh interpreters,
+    and which heavy dependencies it loaded.
+    """
+    samples = []
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        samples.append(probe["seconds"])
+        loaded = probe["loaded"]
+    return statistics.median(samples), loaded
+
+
+def check_budgets(repeat=3, scale=1.0):
+    baseline, _ = measure_import("numpy", repeat)
+    print(f"numpy baseline: {baseline * 1e3:.0f} ms\n")
+
+    failures = []
+    for module, budget in BUDGETS.items():
+        seconds, loaded = measure_import(module, repeat)
+        extra = seconds - baseline
+        allowed = budget * scale
+        ok = extra <= allowed and not loaded
+        print(f"{module:28} {seconds * 1e3:7.0f} ms (+{extra * 1e3:5.0f} ms, "
+              f"budget {allowed * 1e3:4.0f} ms) {'ok' if ok else 'OVER'}"
+              + (f" loaded {', '.join(loaded)}" if loaded else ""))
+        if not ok:
+            failures.append(module)
+
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check entry-point import times")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every budget, e.g. for slower machines")
+    args = parser.parse_args()
+
+    failures = check_budgets(args.repeat, args.scale)
+    if failures:
+        print(f"\n{len(failures)} module(s) over their import budget")
+        sys.exit(1)
@@ -0,0 +1,262 @@
+# benchmarks/run_benchmarks.py
+
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+
+from core.keys import pack_key
+from core.qkd import run_qkd_channel
+from crypto.encryption import derive_aes_key, derive_from_packed, encrypt_message
+from metrics.image_metrics import evaluate_images
+from multichannel.manager import fuse_keys, run_multi_channel_qkd, xor_keys
+from stego.lsb import embed_data, extract_data
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# A case is slower than the baseline when its median grows by more than this
+DEFAULT_THRESHOLD = 1.25
+
+
+# Every case is (group, params, setup). setup(workdir) does the untimed
+# preparation and returns the zero-argument callable that is timed. All
+# inputs are seeded, so each round repeats exactly the same work.
+
+def qkd_channel_cases():
+    for n_qubits, noise, eve in itertools.product((64, 256, 1024), (0.0, 0.05), (False, True)):
+        params = {"n_qubits": n_qubits, "noise": noise, "eve": eve, "engine": "batched"}
+        yield "run_qkd_channel", params, lambda workdir, p=params: (
+            lambda: run_qkd_channel(**p, seed=1)
+        )
+
+    for n_qubits in (4096, 65536):
+        params = {"n_qubits": n_qubits, "noise": 0.05, "eve": False, "backend": "numpy"}
+        yield "run_qkd_channel", params, lambda workdir, p=params: (
+            lambda: run_qkd_channel(**p, seed=1)
+        )
+
+
+def multi_channel_cases():
+    for n_channels in (1, 4, 16):
+        params = {"n_channels": n_channels, "n_qubits": 256, "engine": "batched"}
+        yield "run_multi_channel_qkd", params, lambda workdir, p=params: (
+            lambda: run_multi_channel_qkd(**p, seed=1)
+        )
+
+
+def xor_keys_cases():
+    for n_keys, key_length in itertools.product((2, 16, 128), (1024, 65536)):
+        params = {"n_keys": n_keys, "key_length": key_length}
+
+        def setup(workdir, n_keys=n_keys, key_length=key_length):
+            rng = np.random.default_rng(1)
+            keys = [rng.integers(2, size=key_length, dtype=np.uint8) for _ in range(n_keys)]
+            return lambda: xor_keys(keys)
+
+        yield "xor_keys", params, setup
+
+    for n_keys, packed, trim in itertools.product((16, 128), (False, True), (True, False)):
+        params = {"n_keys": n_keys, "key_length": 65536, "packed": packed, "trim": trim}
+
+        def setup(workdir, n_keys=n_keys, packed=packed, trim=trim):
+            rng = np.random.default_rng(1)
+            # Uneven lengths, as accepted channels sift different amounts
+            keys = [rng.integers(2, size=65536 - i, dtype=np.uint8) for i in range(n_keys)]
+            if packed:
+                keys = [pack_key(k) for k in keys]
+            return lambda: fuse_keys(keys, trim=trim)
+
+        yield "fuse_keys", params, setup
+
+
+def crypto_cases():
+    for key_bits, cache in itertools.product((256, 4096), ("cold", "warm")):
+        def setup(workdir, key_bits=key_bits, cache=cache):
+            key = np.random.default_rng(1).integers(2, size=key_bits, dtype=np.uint8)
+            if cache == "warm":
+                return lambda: derive_aes_key(key)
+
+            def derive():
+                derive_from_packed.cache_clear()
+                return derive_aes_key(key)
+            return derive
+
+        yield "derive_aes_key", {"key_bits": key_bits, "cache": cache}, setup
+
+    for message_size in (1024, 1024 ** 2):
+        def setup(workdir, message_size=message_size):
+            key = np.random.default_rng(1).integers(2, size=256, dtype=np.uint8)
+            message = "x" * message_size
+            return lambda: encrypt_message(message, key)
+
+        yield "encrypt_message", {"message_bytes": message_size}, setup
+
+
+def write_image(workdir, size):
+    path = os.path.join(workdir, f"cover_{size}.png")
+    if not os.path.exists(path):
+        image = np.random.default_rng(1).integers(256, size=(size, size, 3), dtype=np.uint8)
+        cv2.imwrite(path, image)
+    return path
+
+
+def stego_cases():
+    for size, payload_size in itertools.product((256, 1024), (1024, 16384)):
+        params = {"image_size": size, "payload_bytes": payload_size}
+
+        def setup_embed(workdir, size=size, payload_size=payload_size):
+            cover = write_image(workdir, size)
+            payload = os.urandom(payload_size)
+            output = os.path.join(workdir, f"stego_{size}_{payload_size}.png")
+            return lambda: embed_data(cover, payload, output)
+
+        def setup_extract(workdir, size=size, payload_size=payload_size):
+            cover = write_image(workdir, size)
+            output = os.path.join(workdir, f"stego_{size}_{payload_size}.png")
+            embed_data(cover, os.urandom(payload_size), output)
+            return lambda: extract_data(output, payload_size)
+
+        yield "embed_data", params, setup_embed
+        yield "extract_data", params, setup_extract
+
+
+def image_metric_cases():
+    for size in (256, 1024):
+        def setup(workdir, size=size):
+            cover = write_image(workdir, size)
+            stego = os.path.join(workdir, f"metrics_stego_{size}.png")
+            embed_data(cover, os.urandom(1024), stego)
+            return lambda: evaluate_images(cover, stego)
+
+        yield "evaluate_images", {"image_size": size}, setup
+
+
+CASE_GROUPS = (qkd_channel_cases, multi_channel_cases, xor_keys_cases, crypto_cases,
+               stego_cases, image_metric_cases)
+
+
+def case_name(group, params):
+    return group + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+
+def time_case(fn, rounds, min_round_time=0.05):
+    """
+    Time `rounds` rounds of fn. Like timeit, each round repeats the call
+    often enough to last about min_round_time, so microsecond cases are
+    not lost in timer noise. Times are per call, in seconds.
+    """
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    number = max(1, min(10_000, int(min_round_time / max(first, 1e-9))))
+
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+
+    return {
+        "rounds": rounds,
+        "calls_per_round": number,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if rounds > 1 else 0.0
+    }
+
+
+def environment():
+    import qiskit
+    import qiskit_aer
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "qiskit": qiskit.__version__,
+        "qiskit_aer": qiskit_aer.__version__,
+        "opencv": cv2.__version__
+    }
+
+
+def run_benchmarks(rounds=5, match=None):
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for group_cases in CASE_GROUPS:
+            for group, params, setup in group_cases():
+                name = case_name(group, params)
+                if match and match not in name:
+                    continue
+
+                stats = time_case(setup(workdir), rounds)
+                print(f"{name:70} median {stats['median'] * 1e6:12.1f} us")
+                results.append({"name": name, "group": group, "params": params, "stats": stats})
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "results": results
+    }
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Median time ratio of every case present in both reports. Returns the
+    cases that got slower than threshold.
+    """
+    previous = {result["name"]: result["stats"]["median"] for result in baseline["results"]}
+    slower = []
+
+    print("\n=== Comparison with baseline ===")
+    for result in report["results"]:
+        if result["name"] not in previous:
+            continue
+        ratio = result["stats"]["median"] / previous[result["name"]]
+        status = "SLOWER" if ratio > threshold else "ok"
+        print(f"{result['name']:70} x{ratio:5.2f} {status}")
+        if ratio > threshold:
+            slower.append(result["name"])
+
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every pipeline stage")
+    parser.add_argument("--rounds", type=int, default=5, help="timed calls per case")
+    parser.add_argument("--match", help="only run cases whose name contains this text")
+    parser.add_argument("--output", help="JSON report path (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", help="baseline JSON report to check for slowdowns")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="median ratio above which a case counts as slower")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.rounds, args.match)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {len(report['results'])} results to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare(report, json.load(f), args.threshold)
+        if slower:
+            print(f"\n{len(slower)} case(s) slower than the baseline")
+            sys.exit(1)
@@ -0,0 +1,198 @@
+# core/instrumentation.py
+
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+# Off by default: unless enable() was called or a recording() block is
+# active, timer() hands back one shared no-op context and count()
+# returns straight away, so instrumented code pays a function call and
+# two cheap checks.
+ENABLED = False
+
+NULL_TIMER = nullcontext()
+
+
+class Recorder:
+    """
+    Stage timings and counters. There is one process-wide recorder used
+    after enable(), and recording() creates a private one per run.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+
+    def record_time(self, name, seconds):
+        with self.lock:
+            stats = self.timings.get(name)
+            if stats is None:
+                self.timings[name] = [1, seconds, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = min(stats[2], seconds)
+                stats[3] = max(stats[3], seconds)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self.lock:
+            self.timings.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        with self.lock:
+            timings = {
+                name: {
+                    "calls": calls,
+                    "total_seconds": total,
+                    "mean_seconds": total / calls,
+                    "min_seconds": low,
+                    "max_seconds": high
+                }
+                for name, (calls, total, low, high) in self.timings.items()
+            }
+            return {"timings": timings, "counters": dict(self.counters)}
+
+
+GLOBAL = Recorder()
+
+# Recorder of the run in progress in this context (thread or task)
+CURRENT = contextvars.ContextVar("instrumentation_recorder", default=None)
+
+
+def active_recorder():
+    recorder = CURRENT.get()
+    if recorder is not None:
+        return recorder
+    return GLOBAL if ENABLED else None
+
+
+@contextmanager
+def recording():
+    """
+    Record the stages of one run into a fresh Recorder, isolated from
+    concurrent runs in other threads (e.g. other Streamlit sessions)
+    and from the process-wide recorder. Work handed to thread pools is
+    only included if the pool runs it in a copy of this context.
+    """
+    recorder = Recorder()
+    token = CURRENT.set(recorder)
+    try:
+        yield recorder
+    finally:
+        CURRENT.reset(token)
+
+
+def enable(reset_stats=False):
+    global ENABLED
+    if reset_stats:
+        reset()
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def is_enabled():
+    return ENABLED
+
+
+def reset():
+    GLOBAL.reset()
+
+
+def record_time(name, seconds):
+    recorder = active_recorder()
+    if recorder is not None:
+        recorder.record_time(name, seconds)
+
+
+class Timer:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record_time(self.name, time.perf_counter() - self.start)
+
+
+def timer(name):
+    """
+    Context manager adding the wall time of its block to stage `name`.
+    """
+    recorder = active_recorder()
+    return Timer(recorder, name) if recorder is not None else NULL_TIMER
+
+
+def timed(name):
+    """
+    Decorator form of timer() for whole functions.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    recorder = active_recorder()
+    if recorder is not None:
+        recorder.count(name, n)
+
+
+def snapshot(recorder=None):
+    """
+    Stage timings and counters of `recorder` (default: the process-wide
+    one). Work done in process-pool workers is recorded in the workers,
+    not here.
+    """
+    return (recorder or GLOBAL).snapshot()
+
+
+def to_json(path=None, recorder=None):
+    text = json.dumps(snapshot(recorder), indent=2, sort_keys=True)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
+
+
+def to_prometheus(prefix="qkd", recorder=None):
+    """
+    Snapshot in the Prometheus text exposition format: one summary of
+    stage durations labelled by stage, and one counter per counter name.
+    """
+    stats = snapshot(recorder)
+    lines = [
+        f"# HELP {prefix}_stage_seconds Wall time spent in each pipeline stage.",
+        f"# TYPE {prefix}_stage_seconds summary"
+    ]
+    for name, timing in sorted(stats["timings"].items()):
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {timing["total_seconds"]:.9f}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {timing["calls"]}')
+
+    lines.append(f"# HELP {prefix}_events_total Pipeline event counters.")
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, value in sorted(stats["counters"].items()):
+        lines.append(f'{prefix}_events_total{{counter="{name}"}} {value}')
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,53 @@
+# core/keys.py
+
+import numpy as np
+
+
+class PackedKey:
+    """
+    Bit key stored eight bits per byte (np.packbits output) together
+    with its length in bits. Padding bits in the last byte are always
+    zero, so two keys can be compared or XORed byte by byte.
+    """
+
+    __slots__ = ("data", "length")
+
+    def __init__(self, data, length):
+        self.data = data
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __eq__(self, other):
+        return (isinstance(other, PackedKey) and self.length == other.length
+                and np.array_equal(self.data, other.data))
+
+    def __repr__(self):
+        return f"PackedKey(length={self.length})"
+
+    def unpack(self):
+        return np.unpackbits(self.data, count=self.length)
+
+
+def pack_key(bits):
+    if isinstance(bits, PackedKey):
+        return bits
+    bits = np.asarray(bits, dtype=np.uint8)
+    return PackedKey(np.packbits(bits), len(bits))
+
+
+def unpack_key(key):
+    if isinstance(key, PackedKey):
+        return key.unpack()
+    return np.asarray(key, dtype=np.uint8)
+
+
+def truncate_key(key, n_bits):
+    """
+    First n_bits of a packed key, with the padding bits cleared again.
+    """
+    data = key.data[:(n_bits + 7) // 8].copy()
+    if n_bits % 8:
+        data[-1] &= (0xFF << (8 - n_bits % 8)) & 0xFF
+    return PackedKey(data, n_bits)
@@ -0,0 +1,93 @@
+# core/logging_setup.py
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Attributes every LogRecord has; anything else was passed through
+# `extra` and belongs in the structured record
+STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Top-level packages whose module loggers configure_logging routes
+PACKAGES = ("core", "multichannel", "crypto", "stego", "metrics", "pipeline",
+            "reconciliation", "privacy")
+
+LISTENER = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger and message, plus
+    every field passed through `extra` (channel_id, qber, ...).
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRS:
+                entry[key] = value.item() if hasattr(value, "item") else value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=logging.INFO, path=None, structured=False, asynchronous=True,
+                      loggers=PACKAGES):
+    """
+    Route the pipeline's log records to stderr, or to `path` if given,
+    as plain text or JSON lines. With asynchronous=True the calling
+    thread only enqueues records and a QueueListener thread does the
+    formatting and I/O, so hot loops never block on the sink.
+
+    Only this project's loggers are configured (Qiskit logs every
+    transpiler pass at INFO). The library itself only logs; nothing is
+    printed unless an application calls this or configures logging
+    some other way.
+
+    Records still queued are only written once stop_logging() runs. It
+    is registered with atexit, but a process that exits without running
+    atexit handlers (os._exit, a killed worker) must call it first.
+    """
+    global LISTENER
+    stop_logging()
+
+    handler = logging.FileHandler(path) if path else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if structured else
+                         logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    if asynchronous:
+        records = queue.SimpleQueue()
+        LISTENER = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+        LISTENER.start()
+        # The listener thread is a daemon; flush the queue before exit
+        atexit.unregister(stop_logging)
+        atexit.register(stop_logging)
+        handler = logging.handlers.QueueHandler(records)
+
+    for name in loggers:
+        target = logging.getLogger(name)
+        target.setLevel(level)
+        for old in list(target.handlers):
+            target.removeHandler(old)
+        target.addHandler(handler)
+        target.propagate = False
+
+    return handler
+
+
+def stop_logging():
+    """Flush and stop the background listener of an asynchronous setup."""
+    global LISTENER
+    if LISTENER is not None:
+        LISTENER.stop()
+        for handler in LISTENER.handlers:
+            handler.close()
+        LISTENER = None
@@ -0,0 +1,14 @@
+# core/pools.py
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def spawn_pool(workers=None):
+    """
+    Process pool whose workers start as fresh interpreters. Forking
+    after Aer has started its threads can deadlock the children, so
+    every process pool that may run simulations must come from here.
+    """
+    return ProcessPoolExecutor(max_workers=workers,
+                               mp_context=multiprocessing.get_context("spawn"))
@@ -1,18 +1,36 @@
 # core/qkd.py
 
+import logging
+from functools import lru_cache
+
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
-from qiskit_aer.noise import depolarizing_error, NoiseModel
+from core.instrumentation import count, timer
+from core.keys import pack_key
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE = 64
+
+# Bases are stored as uint8 arrays, indexing into BASES
+Z, X = 0, 1
+BASES = ('Z', 'X')
+
+# Qiskit and Aer take most of a second to import, so they are imported
+# inside the functions that build or run circuits. The NumPy backend,
+# and every module that only imports this one, never pays for them.
 
 
 def create_noise_model(p):
+    from qiskit_aer.noise import depolarizing_error, NoiseModel
+
     noise_model = NoiseModel()
     error = depolarizing_error(p, 1)
     noise_model.add_all_qubit_quantum_error(error, ['x', 'h'])
     return noise_model
 
 def prepare_qubit(bit, basis):
+    from qiskit import QuantumCircuit
+
     qc = QuantumCircuit(1, 1)
 
     if bit == 1:
@@ -30,64 +48,450 @@ def measure_qubit(qc, basis):
     return qc
 
 
-def run_qkd_channel(n_qubits=64, eve=False, noise=0.0):
+@lru_cache(maxsize=CACHE_SIZE)
+def get_simulator(method="automatic"):
+    """
+    Shared AerSimulator per simulation method. Seeds and noise models
+    are passed per run, so one instance serves every channel.
+    """
+    from qiskit_aer import AerSimulator
+
+    return AerSimulator(method=method)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_noise_model(p):
+    return create_noise_model(p)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_pass_manager(method="automatic"):
+    from qiskit.transpiler import generate_preset_pass_manager
+
+    # Building the preset pass manager for the Aer target is the
+    # expensive part of transpile, so keep one per simulator
+    return generate_preset_pass_manager(optimization_level=2, backend=get_simulator(method))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_circuit_template(bit, basis, measure_basis, method="automatic"):
+    """
+    Transpiled prepare/measure circuit for one (bit, basis, measure
+    basis) shape, with bases given as Z/X codes. BB84 only ever needs
+    these 8 shapes, both for Bob and for Eve's intercept measurement.
+    """
+    qc = measure_qubit(prepare_qubit(bit, BASES[basis]), BASES[measure_basis])
+    with timer("qkd.transpile"):
+        return get_pass_manager(method).run(qc)
+
+
+def clear_cache():
+    get_simulator.cache_clear()
+    get_noise_model.cache_clear()
+    get_pass_manager.cache_clear()
+    get_circuit_template.cache_clear()
+
+
+def draw_aer_seed(rng, seeded):
+    # Aer draws from its own generator, so every job gets a seed taken
+    # from ours when the caller asked for a reproducible run
+    return int(rng.integers(2**31)) if seeded else None
+
+
+def build_batch_circuit(bits, bases, measure_bases):
+    """
+    Prepare and measure every qubit of a block side by side in one
+    wide circuit. Qubit i follows exactly the gates of
+    prepare_qubit / measure_qubit, so the noise model sees the same
+    x/h gates as in the one-circuit-per-qubit path.
+    """
+    from qiskit import QuantumCircuit
+
+    n = len(bits)
+    qc = QuantumCircuit(n, n)
+
+    for i in range(n):
+        if bits[i] == 1:
+            qc.x(i)
+        if bases[i] == X:
+            qc.h(i)
+
+    for i in range(n):
+        if measure_bases[i] == X:
+            qc.h(i)
+
+    qc.measure(range(n), range(n))
+    return qc
+
+
+def build_batch_circuits(bits, bases, measure_bases, chunk_size=128):
+    circuits = []
+    for start in range(0, len(bits), chunk_size):
+        stop = start + chunk_size
+        circuits.append(build_batch_circuit(
+            bits[start:stop], bases[start:stop], measure_bases[start:stop]
+        ))
+    return circuits
+
+
+def decode_memory(result, first, count):
+    """
+    Measured bits of the single-shot circuits first .. first + count - 1
+    of a job, concatenated in qubit order.
+    """
+    # Aer reports classical bit 0 as the rightmost character
+    memory = ''.join(result.get_memory(i)[0][::-1] for i in range(first, first + count))
+    return np.frombuffer(memory.encode(), dtype=np.uint8) - ord('0')
+
+
+def run_batched(bits, bases, measure_bases, method, noise_model=None, chunk_size=128, seed=None):
+    """
+    Measure all qubits with a single backend.run call, splitting them
+    into circuits of at most chunk_size qubits. Returns the measured
+    bits in the original qubit order.
+    """
+    circuits = build_batch_circuits(bits, bases, measure_bases, chunk_size)
+    count("qkd.circuits", len(circuits))
+
+    with timer("qkd.transpile"):
+        compiled = get_pass_manager(method).run(circuits)
+    with timer("qkd.backend_run"):
+        result = get_simulator(method).run(
+            compiled, shots=1, memory=True, noise_model=noise_model, seed_simulator=seed
+        ).result()
+
+    return decode_memory(result, 0, len(circuits))
+
+
+def run_shots(bits, bases, measure_bases, noise_model=None, rng=None, seeded=False):
+    """
+    Group qubits by (bit, basis, measure basis) and run each group's
+    circuit once with shots=group_size. Shots are independent, so the
+    outcomes are handed back to the group's positions in order. At most
+    8 jobs are needed whatever the number of qubits.
+    """
+    simulator = get_simulator()
+    measured = np.zeros(len(bits), dtype=np.uint8)
+
+    for bit in (0, 1):
+        for basis in (Z, X):
+            for measure_basis in (Z, X):
+                positions = np.flatnonzero(
+                    (bits == bit) & (bases == basis) & (measure_bases == measure_basis)
+                )
+                if len(positions) == 0:
+                    continue
+
+                compiled = get_circuit_template(bit, basis, measure_basis)
+                count("qkd.circuits")
+                with timer("qkd.backend_run"):
+                    job = simulator.run(compiled, shots=len(positions), memory=True,
+                                        noise_model=noise_model,
+                                        seed_simulator=draw_aer_seed(rng, seeded))
+                    memory = ''.join(job.result().get_memory())
+                measured[positions] = np.frombuffer(memory.encode(), dtype=np.uint8) - ord('0')
+
+    return measured
+
+
+def measure_numpy(bits, bases, measure_bases, rng, noise=0.0):
+    """
+    Closed-form sampling of the prepare/measure circuits. Matching
+    bases reproduce the prepared bit, mismatched bases give a uniform
+    outcome. With matching bases transpile cancels the two h gates, so
+    the only noisy gate left is the x of a 1 bit, and its depolarizing
+    error flips the outcome with probability p/2.
+    """
+    with timer("qkd.numpy_sample"):
+        n = len(bits)
+        measured = np.where(bases == measure_bases, bits, rng.integers(2, size=n, dtype=np.uint8))
+
+        if noise > 0:
+            flips = (bits == 1) & (rng.random(n) < noise / 2)
+            measured = measured ^ flips
+
+    return measured
+
+
+def measure_bob(alice_bits, alice_bases, bob_bases, eve, noise, noise_model,
+                engine, backend, chunk_size, rng, seeded):
+    """
+    Bob's measured bits for one block of qubits, with the selected
+    backend and engine.
+    """
+    n_qubits = len(alice_bits)
+
+    if backend == "numpy":
+        sent_bits = alice_bits
+        sent_bases = alice_bases
+
+        # Eve intercept-resend, her own measurement is noiseless
+        if eve:
+            eve_bases = rng.integers(2, size=n_qubits, dtype=np.uint8)
+            sent_bits = measure_numpy(alice_bits, alice_bases, eve_bases, rng)
+            sent_bases = eve_bases
+
+        return measure_numpy(sent_bits, sent_bases, bob_bases, rng, noise=noise)
+
+    if engine == "batched":
+        # The stabilizer method handles wide Clifford circuits with
+        # Pauli noise, which is all BB84 needs.
+        method = "stabilizer"
+
+        sent_bits = alice_bits
+        sent_bases = alice_bases
+
+        # Eve intercept-resend
+        if eve:
+            eve_bases = rng.integers(2, size=n_qubits, dtype=np.uint8)
+            sent_bits = run_batched(alice_bits, alice_bases, eve_bases, method,
+                                    chunk_size=chunk_size, seed=draw_aer_seed(rng, seeded))
+            sent_bases = eve_bases
+
+        return run_batched(sent_bits, sent_bases, bob_bases, method,
+                           noise_model=noise_model, chunk_size=chunk_size,
+                           seed=draw_aer_seed(rng, seeded))
+
+    if engine == "shots":
+        sent_bits = alice_bits
+        sent_bases = alice_bases
+
+        # Eve intercept-resend, grouped by (bit, Alice basis, Eve basis)
+        if eve:
+            eve_bases = rng.integers(2, size=n_qubits, dtype=np.uint8)
+            sent_bits = run_shots(alice_bits, alice_bases, eve_bases, rng=rng, seeded=seeded)
+            sent_bases = eve_bases
 
-    backend = AerSimulator()
-    noise_model = create_noise_model(noise) if noise > 0 else None
+        return run_shots(sent_bits, sent_bases, bob_bases, noise_model=noise_model,
+                         rng=rng, seeded=seeded)
 
-    alice_bits = np.random.randint(2, size=n_qubits)
-    alice_bases = np.random.choice(['Z', 'X'], size=n_qubits)
-    bob_bases = np.random.choice(['Z', 'X'], size=n_qubits)
-    print("Running QKD channel simulation...")
-    alice_results = []
+    simulator = get_simulator()
     bob_results = []
 
     for i in range(n_qubits):
-        qc = prepare_qubit(alice_bits[i], alice_bases[i])
+        bit = alice_bits[i]
+        basis = alice_bases[i]
 
         # Eve intercept-resend
         if eve:
-            eve_basis = np.random.choice(['Z', 'X'])
-            qc_eve = qc.copy()
-            qc_eve = measure_qubit(qc_eve, eve_basis)
-
-            compiled = transpile(qc_eve, backend)
-            result = backend.run(compiled, shots=1).result().get_counts()
+            eve_basis = int(rng.integers(2))
+            compiled = get_circuit_template(bit, basis, eve_basis)
+            count("qkd.circuits")
+            with timer("qkd.backend_run"):
+                job = simulator.run(compiled, shots=1, seed_simulator=draw_aer_seed(rng, seeded))
+                result = job.result().get_counts()
             eve_bit = int(list(result.keys())[0])
 
-            qc = prepare_qubit(eve_bit, eve_basis)
-
-        qc = measure_qubit(qc, bob_bases[i])
+            bit = eve_bit
+            basis = eve_basis
 
-        compiled = transpile(qc, backend)
-        job = backend.run(compiled, shots=1, noise_model=noise_model)
-        result = job.result().get_counts()
+        compiled = get_circuit_template(bit, basis, bob_bases[i])
+        count("qkd.circuits")
+        with timer("qkd.backend_run"):
+            job = simulator.run(compiled, shots=1, noise_model=noise_model,
+                                seed_simulator=draw_aer_seed(rng, seeded))
+            result = job.result().get_counts()
         measured_bit = int(list(result.keys())[0])
 
-        alice_results.append(alice_bits[i])
         bob_results.append(measured_bit)
 
-    sifted_alice = []
-    sifted_bob = []
+    return np.array(bob_results, dtype=np.uint8)
 
-    for i in range(n_qubits):
-        if alice_bases[i] == bob_bases[i]:
-            sifted_alice.append(alice_results[i])
-            sifted_bob.append(bob_results[i])
 
-    sifted_alice = np.array(sifted_alice)
-    sifted_bob = np.array(sifted_bob)
+def qber_bounds(errors, n, z=2.576):
+    """
+    Wilson score interval for the QBER after `errors` mismatches in
+    `n` sifted bits. The default z gives a two-sided 99% interval.
+    """
+    if n == 0:
+        return 0.0, 1.0
 
+    p = errors / n
+    denom = 1 + z ** 2 / n
+    centre = (p + z ** 2 / (2 * n)) / denom
+    margin = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denom
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def channel_result(sifted_alice, sifted_bob, qber_threshold=0.11, packed=False):
     if len(sifted_alice) == 0:
         return None
 
-    errors = np.sum(sifted_alice != sifted_bob)
-    qber = errors / len(sifted_alice)
+    qber = np.sum(sifted_alice != sifted_bob) / len(sifted_alice)
 
     return {
         "qber": qber,
         "key_length": len(sifted_alice),
-        "accepted": qber < 0.11,
-        "alice_key": sifted_alice,
-        "bob_key": sifted_bob
+        "accepted": qber < qber_threshold,
+        "alice_key": pack_key(sifted_alice) if packed else sifted_alice,
+        "bob_key": pack_key(sifted_bob) if packed else sifted_bob
     }
+
+
+def run_qkd_channel(n_qubits=64, eve=False, noise=0.0, engine="serial", chunk_size=128,
+                    backend="aer", seed=None, qber_threshold=0.11, block_size=None,
+                    early_stop="both", z=2.576, packed=False):
+    """
+    Simulate one BB84 channel of n_qubits.
+
+    With block_size set, qubits are simulated and sifted block by block
+    while a running QBER and its confidence interval are kept. The run
+    stops as soon as the interval lies entirely above qber_threshold
+    (early_stop="above" or "both") or entirely below it (only "both";
+    this also shortens the key). The result then also reports
+    qubits_used, stopped_early and qber_bounds.
+
+    Keys are uint8 bit arrays, or PackedKey objects with packed=True.
+    """
+
+    if backend not in ("aer", "numpy"):
+        raise ValueError(f"Unknown backend: {backend}")
+    if engine not in ("serial", "batched", "shots"):
+        raise ValueError(f"Unknown engine: {engine}")
+    if early_stop not in ("above", "both"):
+        raise ValueError(f"Unknown early_stop: {early_stop}")
+
+    rng = np.random.default_rng(seed)
+    seeded = seed is not None
+    noise_model = get_noise_model(noise) if noise > 0 and backend == "aer" else None
+
+    alice_bits = rng.integers(2, size=n_qubits, dtype=np.uint8)
+    alice_bases = rng.integers(2, size=n_qubits, dtype=np.uint8)
+    bob_bases = rng.integers(2, size=n_qubits, dtype=np.uint8)
+    logger.debug("Running QKD channel simulation", extra={
+        "n_qubits": n_qubits, "eve": bool(eve), "noise": noise, "engine": engine, "backend": backend
+    })
+
+    step = block_size or max(n_qubits, 1)
+    sifted_alice = []
+    sifted_bob = []
+    sifted_count = 0
+    errors = 0
+    qubits_used = 0
+    stopped_early = False
+    bounds = (0.0, 1.0)
+
+    for start in range(0, n_qubits, step):
+        block = slice(start, start + step)
+        bob_results = measure_bob(alice_bits[block], alice_bases[block], bob_bases[block],
+                                  eve, noise, noise_model, engine, backend, chunk_size,
+                                  rng, seeded)
+
+        with timer("qkd.sifting"):
+            matches = alice_bases[block] == bob_bases[block]
+            sifted_alice.append(alice_bits[block][matches])
+            sifted_bob.append(bob_results[matches])
+            sifted_count += len(sifted_alice[-1])
+            errors += int(np.sum(sifted_alice[-1] != sifted_bob[-1]))
+        qubits_used = min(start + step, n_qubits)
+
+        if block_size is None:
+            continue
+
+        bounds = qber_bounds(errors, sifted_count, z)
+        if bounds[0] > qber_threshold or (early_stop == "both" and bounds[1] < qber_threshold):
+            stopped_early = qubits_used < n_qubits
+            break
+
+    sifted_alice = np.concatenate(sifted_alice) if sifted_alice else np.zeros(0, dtype=np.uint8)
+    sifted_bob = np.concatenate(sifted_bob) if sifted_bob else np.zeros(0, dtype=np.uint8)
+
+    result = channel_result(sifted_alice, sifted_bob, qber_threshold, packed)
+    count("qkd.qubits", qubits_used)
+    count("qkd.sifted_bits", sifted_count)
+
+    if result is not None and block_size is not None:
+        result["qubits_used"] = qubits_used
+        result["stopped_early"] = stopped_early
+        result["qber_bounds"] = bounds
+
+    return result
+
+
+def run_circuit_sets(circuit_sets, method, noise_model=None, seed=None):
+    """
+    Submit the single-shot circuits of several channels as one job, with
+    Aer's experiment-level parallelism enabled.
+    """
+    circuits = [qc for circuit_set in circuit_sets for qc in circuit_set]
+    count("qkd.circuits", len(circuits))
+
+    with timer("qkd.transpile"):
+        compiled = get_pass_manager(method).run(circuits)
+    with timer("qkd.backend_run"):
+        return get_simulator(method).run(
+            compiled, shots=1, memory=True, noise_model=noise_model, seed_simulator=seed,
+            max_parallel_experiments=0
+        ).result()
+
+
+def run_qkd_channels(eves, n_qubits=64, noise=0.0, seeds=None, chunk_size=128,
+                     qber_threshold=0.11, packed=False):
+    """
+    Simulate several channels with the batched engine in at most two
+    Aer jobs in total: one for the Eve intercepts of every channel that
+    has Eve, one for Bob's measurements on every channel. Aer runs the
+    circuits of a job in parallel on its own thread pool. Returns one
+    run_qkd_channel-style result per channel, in order.
+    """
+    method = "stabilizer"
+    seeds = seeds if seeds is not None else [None] * len(eves)
+    seeded = any(seed is not None for seed in seeds)
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    noise_model = get_noise_model(noise) if noise > 0 else None
+    job_rng = rngs[0] if rngs else None
+    logger.debug("Running QKD channel simulations in one batch", extra={
+        "n_channels": len(eves), "n_qubits": n_qubits, "noise": noise
+    })
+
+    channels = []
+    for eve, rng in zip(eves, rngs):
+        channel = {
+            "alice_bits": rng.integers(2, size=n_qubits, dtype=np.uint8),
+            "alice_bases": rng.integers(2, size=n_qubits, dtype=np.uint8),
+            "bob_bases": rng.integers(2, size=n_qubits, dtype=np.uint8)
+        }
+        channel["sent_bits"] = channel["alice_bits"]
+        channel["sent_bases"] = channel["alice_bases"]
+        if eve:
+            channel["eve_bases"] = rng.integers(2, size=n_qubits, dtype=np.uint8)
+        channels.append(channel)
+
+    # Eve intercept-resend for every channel she is on
+    eve_channels = [channel for channel in channels if "eve_bases" in channel]
+    if eve_channels:
+        circuit_sets = [
+            build_batch_circuits(channel["alice_bits"], channel["alice_bases"],
+                                 channel["eve_bases"], chunk_size)
+            for channel in eve_channels
+        ]
+        result = run_circuit_sets(circuit_sets, method, seed=draw_aer_seed(job_rng, seeded))
+
+        first = 0
+        for channel, circuit_set in zip(eve_channels, circuit_sets):
+            channel["sent_bits"] = decode_memory(result, first, len(circuit_set))
+            channel["sent_bases"] = channel["eve_bases"]
+            first += len(circuit_set)
+
+    circuit_sets = [
+        build_batch_circuits(channel["sent_bits"], channel["sent_bases"],
+                             channel["bob_bases"], chunk_size)
+        for channel in channels
+    ]
+    result = run_circuit_sets(circuit_sets, method, noise_model=noise_model,
+                              seed=draw_aer_seed(job_rng, seeded))
+
+    results = []
+    first = 0
+    for channel, circuit_set in zip(channels, circuit_sets):
+        bob_results = decode_memory(result, first, len(circuit_set))
+        first += len(circuit_set)
+
+        with timer("qkd.sifting"):
+            matches = channel["alice_bases"] == channel["bob_bases"]
+            results.append(channel_result(channel["alice_bits"][matches], bob_results[matches],
+                                          qber_threshold, packed))
+        count("qkd.qubits", n_qubits)
+        count("qkd.sifted_bits", results[-1]["key_length"] if results[-1] else 0)
+
+    return results
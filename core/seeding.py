@@ -0,0 +1,37 @@
+# core/seeding.py
+
+import hashlib
+
+import numpy as np
+
+
+def as_seed_sequence(seed=None):
+    """
+    Accept None, an int, a SeedSequence or a Generator and return the
+    SeedSequence to spawn independent child streams from.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return seed.bit_generator.seed_seq
+    return np.random.SeedSequence(seed)
+
+
+def spawn_seeds(seed, n):
+    return as_seed_sequence(seed).spawn(n)
+
+
+def keyed_seed(seed, label):
+    """
+    Child SeedSequence identified by `label` (e.g. a sweep's parameter
+    value) rather than by spawn order, so adding or reordering labels
+    never changes the stream of an existing one. Numeric labels are
+    keyed by value, so 1, 1.0 and np.float64(1) share a stream.
+    """
+    root = as_seed_sequence(seed)
+    if isinstance(label, (int, float, np.number)) and not isinstance(label, bool):
+        label = float(label).hex()
+    digest = hashlib.sha256(repr(label).encode()).digest()
+    return np.random.SeedSequence(root.entropy,
+                                  spawn_key=root.spawn_key + (int.from_bytes(digest[:8], "little"),),
+                                  pool_size=root.pool_size)
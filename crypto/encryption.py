@@ -1,19 +1,50 @@
 # crypto/encryption.py
 
 import hashlib
+from functools import lru_cache
+
+import numpy as np
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
+from core.instrumentation import count, timer
+from core.keys import PackedKey
 
+KEY_CACHE_SIZE = 128
 
-def derive_aes_key(bit_array):
-    bit_string = ''.join(str(b) for b in bit_array)
-    return hashlib.sha256(bit_string.encode()).digest()
 
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def derive_from_packed(packed, n_bits, kdf="compat"):
+    """
+    AES key from np.packbits output. The packed bytes and bit count
+    are the key's fingerprint, so repeated messages under one session
+    key hit the cache instead of re-hashing.
 
-def encrypt_message(message, quantum_key):
-    aes_key = derive_aes_key(quantum_key)
-    cipher = AES.new(aes_key, AES.MODE_CBC)
-    ciphertext = cipher.encrypt(pad(message.encode(), AES.block_size))
+    "compat" hashes the ASCII '0'/'1' string like the original
+    derivation, "packed" hashes the bit count and packed bytes directly.
+    """
+    if kdf == "compat":
+        bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=n_bits)
+        return hashlib.sha256((bits + ord('0')).tobytes()).digest()
+    if kdf == "packed":
+        return hashlib.sha256(n_bits.to_bytes(8, "big") + packed).digest()
+    raise ValueError(f"Unknown kdf: {kdf}")
+
+
+def derive_aes_key(bit_array, kdf="compat"):
+    with timer("aes.derive_key"):
+        if isinstance(bit_array, PackedKey):
+            return derive_from_packed(bit_array.data.tobytes(), bit_array.length, kdf)
+
+        bits = np.asarray(bit_array, dtype=np.uint8)
+        return derive_from_packed(np.packbits(bits).tobytes(), len(bits), kdf)
+
+
+def encrypt_message(message, quantum_key, kdf="compat"):
+    aes_key = derive_aes_key(quantum_key, kdf)
+    with timer("aes.encrypt"):
+        cipher = AES.new(aes_key, AES.MODE_CBC)
+        ciphertext = cipher.encrypt(pad(message.encode(), AES.block_size))
+    count("aes.bytes_encrypted", len(ciphertext))
 
     return {
         "ciphertext": ciphertext,
@@ -21,9 +52,99 @@ def encrypt_message(message, quantum_key):
     }
 
 
-def decrypt_message(ciphertext, iv, quantum_key):
-    aes_key = derive_aes_key(quantum_key)
-    cipher = AES.new(aes_key, AES.MODE_CBC, iv=iv)
-    plaintext = unpad(cipher.decrypt(ciphertext), AES.block_size)
+def decrypt_message(ciphertext, iv, quantum_key, kdf="compat"):
+    aes_key = derive_aes_key(quantum_key, kdf)
+    with timer("aes.decrypt"):
+        cipher = AES.new(aes_key, AES.MODE_CBC, iv=iv)
+        plaintext = unpad(cipher.decrypt(ciphertext), AES.block_size)
+    count("aes.bytes_decrypted", len(ciphertext))
 
     return plaintext.decode()
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    Yield byte chunks from a file-like object (anything with read) or
+    pass an iterable of byte strings straight through.
+    """
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+def encrypt_chunks(chunks, quantum_key, kdf="compat"):
+    """
+    Streaming counterpart of encrypt_message. Yields the IV followed by
+    the AES-CBC ciphertext, i.e. the same iv + ciphertext payload the
+    demos build, holding at most one chunk in memory.
+    """
+    aes_key = derive_aes_key(quantum_key, kdf)
+    cipher = AES.new(aes_key, AES.MODE_CBC)
+    yield cipher.iv
+
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        usable = len(buffer) - len(buffer) % AES.block_size
+        if usable:
+            yield cipher.encrypt(buffer[:usable])
+            buffer = buffer[usable:]
+
+    yield cipher.encrypt(pad(buffer, AES.block_size))
+
+
+def decrypt_chunks(chunks, quantum_key, kdf="compat"):
+    """
+    Streaming counterpart of decrypt_message for an iv + ciphertext
+    payload. The last block is held back until the end because it
+    carries the padding.
+    """
+    aes_key = derive_aes_key(quantum_key, kdf)
+    cipher = None
+
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        if cipher is None:
+            if len(buffer) < AES.block_size:
+                continue
+            cipher = AES.new(aes_key, AES.MODE_CBC, iv=buffer[:AES.block_size])
+            buffer = buffer[AES.block_size:]
+
+        usable = (len(buffer) - 1) // AES.block_size * AES.block_size
+        if usable > 0:
+            yield cipher.decrypt(buffer[:usable])
+            buffer = buffer[usable:]
+
+    if cipher is None or len(buffer) != AES.block_size:
+        raise ValueError("Ciphertext is truncated or not block aligned")
+
+    yield unpad(cipher.decrypt(buffer), AES.block_size)
+
+
+def encrypt_stream(source, destination, quantum_key, chunk_size=CHUNK_SIZE, kdf="compat"):
+    written = 0
+    with timer("aes.encrypt_stream"):
+        for block in encrypt_chunks(iter_chunks(source, chunk_size), quantum_key, kdf):
+            destination.write(block)
+            written += len(block)
+    count("aes.bytes_encrypted", written)
+    return written
+
+
+def decrypt_stream(source, destination, quantum_key, chunk_size=CHUNK_SIZE, kdf="compat"):
+    written = 0
+    with timer("aes.decrypt_stream"):
+        for block in decrypt_chunks(iter_chunks(source, chunk_size), quantum_key, kdf):
+            destination.write(block)
+            written += len(block)
+    count("aes.bytes_decrypted", written)
+    return written
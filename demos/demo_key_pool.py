@@ -0,0 +1,32 @@
+import sys, os, time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from multichannel.key_pool import KeyPool
+from crypto.encryption import encrypt_message, decrypt_message
+
+# Keys are simulated in the background, so each message only waits on
+# AES instead of a full multi-channel QKD run.
+
+with KeyPool(size=6, low_water=2, n_channels=4, n_qubits=128,
+             eve_probability=0.4, noise=0.02, engine="batched") as pool:
+
+    print("Filling key pool...")
+    pool.wait_full()
+
+    for i in range(4):
+        message = f"Message {i} over a pooled quantum key"
+
+        start = time.time()
+        key = pool.get_key()
+        encrypted = encrypt_message(message, key)
+        elapsed = (time.time() - start) * 1000
+
+        decrypted = decrypt_message(encrypted["ciphertext"], encrypted["iv"], key)
+        print(f"{decrypted} | key length {len(key)} | {elapsed:.2f} ms")
+
+    material = pool.get_bits(256)
+    print(f"\nDrew {len(material)} bits of raw key material")
+
+    print("\n=== KEY POOL USAGE ===")
+    for k, v in pool.usage().items():
+        print(f"{k}: {v}")
@@ -3,7 +3,8 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from multichannel.manager import run_multi_channel_qkd
 from crypto.encryption import encrypt_message, decrypt_message
-from stego.lsb import embed_data, extract_data
+import cv2
+from stego.lsb import load_image, embed_array, extract_array
 
 
 def slow_print(text, delay=0.7):
@@ -71,7 +72,8 @@ slow_print(f"→ Ciphertext size: {len(payload)} bytes\n")
 slow_print("[STAGE 5] Covert communication layer activated (Steganography)...")
 slow_print("→ Embedding encrypted message inside cover image")
 
-embed_data("assets/cover.png", payload, "assets/stego.png")
+stego = embed_array(load_image("assets/cover.png"), payload)
+cv2.imwrite("assets/stego.png", stego)
 
 slow_print("→ Stego image generated: assets/stego.png")
 slow_print("→ Visually indistinguishable from original image\n")
@@ -82,7 +84,7 @@ slow_print("→ Visually indistinguishable from original image\n")
 
 slow_print("[STAGE 6] Receiver extracting hidden data from stego image...")
 
-extracted = extract_data("assets/stego.png", len(payload))
+extracted = extract_array(stego, len(payload))
 iv = extracted[:16]
 ciphertext = extracted[16:]
 
@@ -0,0 +1,41 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from core.qkd import run_qkd_channel
+from crypto.encryption import encrypt_message, decrypt_message
+from multichannel.manager import run_multi_channel_qkd
+from privacy.amplification import privacy_amplify
+from reconciliation.cascade import cascade_reconcile
+
+print("\n=== Cascade reconciliation of a noisy channel ===")
+
+res = run_qkd_channel(n_qubits=20000, eve=False, noise=0.08, backend="numpy")
+print(f"Sifted key length: {res['key_length']}")
+print(f"Measured QBER: {round(float(res['qber']), 4)}")
+
+rec = cascade_reconcile(res["alice_key"], res["bob_key"], res["qber"])
+
+print(f"Corrected bits: {rec['corrected_bits']}")
+print(f"Residual errors: {rec['residual_errors']}")
+print(f"Leaked parity bits: {rec['leaked_bits']}")
+print(f"Communication rounds: {rec['rounds']}")
+
+print("\n=== Privacy amplification ===")
+
+amp = privacy_amplify(rec["bob_key"], res["qber"], rec["leaked_bits"])
+print(f"Secret key length: {amp['key_length']} of {res['key_length']} sifted bits")
+
+print("\n=== Post-processed multi-channel key ===")
+
+result = run_multi_channel_qkd(n_channels=4, n_qubits=20000, eve_probability=0.4,
+                               noise=0.02, backend="numpy", post_process=True)
+
+if result["success"]:
+    for ch in result["channels"]:
+        print(ch)
+    message = "Amplified quantum key in use."
+    encrypted = encrypt_message(message, result["final_key"])
+    print(f"Final key length: {result['final_key_length']}")
+    print("Decrypted:", decrypt_message(encrypted["ciphertext"], encrypted["iv"], result["final_key"]))
+else:
+    print("System failed:", result["reason"])
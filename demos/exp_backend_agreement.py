@@ -0,0 +1,40 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from core.qkd import run_qkd_channel
+
+# Compare the closed-form NumPy backend against every Aer engine on the
+# same settings. The NumPy model assumes the transpiler cancels the h
+# pairs of each template, so every engine is checked, not just one. The
+# mean QBERs should agree within a few standard errors; exits non-zero
+# on any mismatch.
+
+cases = [(False, 0.0), (False, 0.05), (False, 0.1), (True, 0.0), (True, 0.05)]
+runs = 20
+
+# The serial engine simulates one circuit per qubit, so it gets fewer
+engines = [("serial", 64), ("shots", 256), ("batched", 256)]
+
+mismatches = 0
+for engine, n_qubits in engines:
+    print(f"\n=== Aer ({engine}) vs NumPy backend, {n_qubits} qubits ===")
+    for eve, noise in cases:
+        aer = [run_qkd_channel(n_qubits, eve=eve, noise=noise, engine=engine, seed=s)["qber"]
+               for s in range(runs)]
+        fast = [run_qkd_channel(n_qubits, eve=eve, noise=noise, backend="numpy", seed=s)["qber"]
+                for s in range(runs)]
+
+        diff = np.mean(aer) - np.mean(fast)
+        stderr = np.sqrt(np.var(aer) / runs + np.var(fast) / runs)
+        z = diff / stderr if stderr > 0 else 0.0
+        status = "OK" if abs(z) < 3 else "MISMATCH"
+        if abs(z) >= 3:
+            mismatches += 1
+
+        print(f"Eve {eve!s:5} | Noise {noise:<4} | Aer QBER {np.mean(aer):.4f} | "
+              f"NumPy QBER {np.mean(fast):.4f} | z = {z:+.2f} | {status}")
+
+if mismatches:
+    print(f"\n{mismatches} case(s) where Aer and NumPy disagree")
+    sys.exit(1)
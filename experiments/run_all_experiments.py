@@ -1,6 +1,7 @@
 # experiments/run_all_experiments.py
 
 import sys, os, csv
+import argparse
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import numpy as np
@@ -8,10 +9,29 @@ import matplotlib.pyplot as plt
 
 from metrics.quantum_metrics import qber_vs_eve, ber_vs_noise, success_rate_vs_channels
 from metrics.image_metrics import evaluate_images
+from metrics.checkpoint import SweepLog
+from metrics.result_cache import ResultCache
 
 OUTPUT_DIR = "outputs"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# A fixed seed makes every (point, run) reproducible, so results already
+# in the cache are reused and only new points or extra runs are simulated
+SEED = 2024
+CACHE = ResultCache()
+
+# Completed runs are appended to one JSONL log per sweep; --resume picks
+# a killed run back up from these logs instead of starting from zero
+parser = argparse.ArgumentParser(description="Run every experiment")
+parser.add_argument("--resume", action="store_true",
+                    help="skip runs already recorded in the checkpoint logs")
+RESUME = parser.parse_args().resume
+CHECKPOINT_DIR = f"{OUTPUT_DIR}/checkpoints"
+
+
+def checkpoint(name):
+    return SweepLog(f"{CHECKPOINT_DIR}/{name}.jsonl", resume=RESUME)
+
 
 # -----------------------------
 # 1. QBER vs Eve Probability
@@ -19,7 +39,8 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 print("[1/4] Running QBER vs Eve probability experiment...")
 
 eve_probs = [0, 0.2, 0.4, 0.6, 0.8, 1.0]
-qber_eve = qber_vs_eve(eve_probs, runs=10, n_qubits=64)
+qber_eve = qber_vs_eve(eve_probs, runs=10, n_qubits=64, seed=SEED, cache=CACHE,
+                       checkpoint=checkpoint("qber_vs_eve"))
 
 with open(f"{OUTPUT_DIR}/qber_vs_eve.csv", "w", newline="") as f:
     writer = csv.writer(f)
@@ -43,7 +64,8 @@ plt.close()
 print("[2/4] Running QBER vs noise experiment...")
 
 noise_levels = [0, 0.01, 0.02, 0.05, 0.1]
-qber_noise = ber_vs_noise(noise_levels, runs=10, n_qubits=64)
+qber_noise = ber_vs_noise(noise_levels, runs=10, n_qubits=64, seed=SEED, cache=CACHE,
+                          checkpoint=checkpoint("qber_vs_noise"))
 
 with open(f"{OUTPUT_DIR}/qber_vs_noise.csv", "w", newline="") as f:
     writer = csv.writer(f)
@@ -67,7 +89,8 @@ plt.close()
 print("[3/4] Running system success vs channels experiment...")
 
 channels = [1, 2, 3, 4, 5, 6]
-success_rates = success_rate_vs_channels(channels, runs=12)
+success_rates = success_rate_vs_channels(channels, runs=12, seed=SEED, cache=CACHE,
+                                         checkpoint=checkpoint("success_vs_channels"))
 
 with open(f"{OUTPUT_DIR}/success_vs_channels.csv", "w", newline="") as f:
     writer = csv.writer(f)
@@ -1,25 +1,49 @@
 # experiments/run_all_experiments.py
 
 import sys, os, csv
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
 import time
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from metrics.quantum_metrics import qber_vs_eve, ber_vs_noise, success_rate_vs_channels
 from metrics.image_metrics import evaluate_images
+from metrics.checkpoint import SweepLog
+from metrics.result_cache import ResultCache
 
 OUTPUT_DIR = "outputs_optimized"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# A fixed seed makes every (point, run) reproducible, so results already
+# in the cache are reused and only new points or extra runs are simulated
+SEED = 2024
+CACHE = ResultCache()
+
+# Completed runs are appended to one JSONL log per sweep; --resume picks
+# a killed run back up from these logs instead of starting from zero
+CHECKPOINT_DIR = f"{OUTPUT_DIR}/checkpoints"
+RESUME = False
+
+
+def checkpoint(name):
+    return SweepLog(f"{CHECKPOINT_DIR}/{name}.jsonl", resume=RESUME)
+
+
+# Every (parameter point, run) pair is spread across this many processes.
+# Spawned workers re-import this script, so matplotlib is only imported
+# inside the experiments, in the parent.
+WORKERS = os.cpu_count()
+
 
 def experiment_1():
     """QBER vs Eve Probability"""
+    import matplotlib.pyplot as plt
+
     print("[1/4] Running QBER vs Eve probability experiment...")
     eve_probs = [0, 0.2, 0.4, 0.6, 0.8, 1.0]
-    qber_eve = qber_vs_eve(eve_probs, runs=5, n_qubits=64)  # Reduced from 10 to 5 runs
+    qber_eve = qber_vs_eve(eve_probs, runs=5, n_qubits=64, seed=SEED, cache=CACHE,
+                           checkpoint=checkpoint("qber_vs_eve"), workers=WORKERS)  # Reduced from 10 to 5 runs
     
     with open(f"{OUTPUT_DIR}/qber_vs_eve.csv", "w", newline="") as f:
         writer = csv.writer(f)
@@ -41,9 +65,12 @@ def experiment_1():
 
 def experiment_2():
     """QBER vs Noise"""
+    import matplotlib.pyplot as plt
+
     print("[2/4] Running QBER vs noise experiment...")
     noise_levels = [0, 0.01, 0.02, 0.05, 0.1]
-    qber_noise = ber_vs_noise(noise_levels, runs=5, n_qubits=64)  # Reduced from 10 to 5 runs
+    qber_noise = ber_vs_noise(noise_levels, runs=5, n_qubits=64, seed=SEED, cache=CACHE,
+                              checkpoint=checkpoint("qber_vs_noise"), workers=WORKERS)  # Reduced from 10 to 5 runs
     
     with open(f"{OUTPUT_DIR}/qber_vs_noise.csv", "w", newline="") as f:
         writer = csv.writer(f)
@@ -65,9 +92,13 @@ def experiment_2():
 
 def experiment_3():
     """Success rate vs channels"""
+    import matplotlib.pyplot as plt
+
     print("[3/4] Running system success vs channels experiment...")
     channels = [1, 2, 3, 4, 5, 6]
-    success_rates = success_rate_vs_channels(channels, runs=6)  # Reduced from 12 to 6 runs
+    success_rates = success_rate_vs_channels(channels, runs=6, seed=SEED, cache=CACHE,
+                                             checkpoint=checkpoint("success_vs_channels"),
+                                             workers=WORKERS)  # Reduced from 12 to 6 runs
     
     with open(f"{OUTPUT_DIR}/success_vs_channels.csv", "w", newline="") as f:
         writer = csv.writer(f)
@@ -100,23 +131,21 @@ def experiment_4():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every experiment")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip runs already recorded in the checkpoint logs")
+    RESUME = parser.parse_args().resume
+
     start_time = time.time()
     
-    # Run experiments in parallel
-    with ProcessPoolExecutor(max_workers=4) as executor:
-        futures = [
-            executor.submit(experiment_1),
-            executor.submit(experiment_2),
-            executor.submit(experiment_3),
-            executor.submit(experiment_4)
-        ]
-        
-        for future in as_completed(futures):
-            try:
-                result = future.result()
-                print(f"✓ {result}")
-            except Exception as e:
-                print(f"✗ Experiment failed: {e}")
+    # Experiments run one after another, each one fanning its own runs
+    # out across WORKERS processes
+    for experiment in (experiment_1, experiment_2, experiment_3, experiment_4):
+        try:
+            result = experiment()
+            print(f"✓ {result}")
+        except Exception as e:
+            print(f"✗ Experiment failed: {e}")
     
     elapsed = time.time() - start_time
     
@@ -2,6 +2,7 @@
 # Fast version for testing - minimal runs
 
 import sys, os, csv
+import argparse
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import numpy as np
@@ -9,10 +10,29 @@ import matplotlib.pyplot as plt
 
 from metrics.quantum_metrics import qber_vs_eve, ber_vs_noise, success_rate_vs_channels
 from metrics.image_metrics import evaluate_images
+from metrics.checkpoint import SweepLog
+from metrics.result_cache import ResultCache
 
 OUTPUT_DIR = "outputs_quick"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# A fixed seed makes every (point, run) reproducible, so results already
+# in the cache are reused and only new points or extra runs are simulated
+SEED = 2024
+CACHE = ResultCache()
+
+# Completed runs are appended to one JSONL log per sweep; --resume picks
+# a killed run back up from these logs instead of starting from zero
+parser = argparse.ArgumentParser(description="Run every experiment")
+parser.add_argument("--resume", action="store_true",
+                    help="skip runs already recorded in the checkpoint logs")
+RESUME = parser.parse_args().resume
+CHECKPOINT_DIR = f"{OUTPUT_DIR}/checkpoints"
+
+
+def checkpoint(name):
+    return SweepLog(f"{CHECKPOINT_DIR}/{name}.jsonl", resume=RESUME)
+
 
 # -----------------------------
 # 1. QBER vs Eve Probability
@@ -20,7 +40,8 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 print("[1/4] Running QBER vs Eve probability experiment...")
 
 eve_probs = [0, 0.5, 1.0]  # Reduced data points
-qber_eve = qber_vs_eve(eve_probs, runs=3, n_qubits=32)  # Reduced runs and qubits
+qber_eve = qber_vs_eve(eve_probs, runs=3, n_qubits=32, seed=SEED, cache=CACHE,
+                       checkpoint=checkpoint("qber_vs_eve"))  # Reduced runs and qubits
 
 with open(f"{OUTPUT_DIR}/qber_vs_eve.csv", "w", newline="") as f:
     writer = csv.writer(f)
@@ -44,7 +65,8 @@ plt.close()
 print("[2/4] Running QBER vs noise experiment...")
 
 noise_levels = [0, 0.05, 0.1]  # Reduced data points
-qber_noise = ber_vs_noise(noise_levels, runs=3, n_qubits=32)
+qber_noise = ber_vs_noise(noise_levels, runs=3, n_qubits=32, seed=SEED, cache=CACHE,
+                          checkpoint=checkpoint("qber_vs_noise"))
 
 with open(f"{OUTPUT_DIR}/qber_vs_noise.csv", "w", newline="") as f:
     writer = csv.writer(f)
@@ -68,7 +90,8 @@ plt.close()
 print("[3/4] Running system success vs channels experiment...")
 
 channels = [1, 3, 5]  # Reduced data points
-success_rates = success_rate_vs_channels(channels, runs=3)
+success_rates = success_rate_vs_channels(channels, runs=3, seed=SEED, cache=CACHE,
+                                         checkpoint=checkpoint("success_vs_channels"))
 
 with open(f"{OUTPUT_DIR}/success_vs_channels.csv", "w", newline="") as f:
     writer = csv.writer(f)
@@ -0,0 +1,62 @@
+# metrics/checkpoint.py
+
+import json
+import os
+import threading
+
+from metrics.result_cache import to_json
+
+
+class SweepLog:
+    """
+    Append-only JSONL log of completed sweep runs, one record per
+    (point, run) keyed by result_key. Every batch of records is flushed
+    and fsynced before the sweep moves on, so a crashed or killed sweep
+    loses at most the runs that were still in flight.
+
+    With resume=False an existing log is truncated and the sweep starts
+    from zero; with resume=True its records are reused.
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = path
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not resume and os.path.exists(path):
+            os.remove(path)
+
+    def load(self):
+        """Return {key: value} for every complete record in the log."""
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line torn by a crash mid-write is simply redone
+                    continue
+                done[record["key"]] = record["value"]
+        return done
+
+    def append(self, records):
+        """Durably append records of {key, point, run, value}."""
+        if not records:
+            return
+        lines = "".join(
+            json.dumps({k: to_json(v) for k, v in record.items()}) + "\n" for record in records
+        )
+        with self.lock, open(self.path, "ab+") as f:
+            # Terminate a line torn by an earlier crash so it does not
+            # swallow the first new record
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines = "\n" + lines
+            f.write(lines.encode())
+            f.flush()
+            os.fsync(f.fileno())
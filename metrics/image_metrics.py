@@ -2,11 +2,13 @@
 
 import cv2
 import numpy as np
-from skimage.metrics import structural_similarity as ssim
+from core.instrumentation import timer
+from stego.lsb import load_image
 
 
 def compute_mse(img1, img2):
-    return np.mean((img1 - img2) ** 2)
+    with timer("image.mse"):
+        return np.mean((img1 - img2) ** 2)
 
 
 def compute_psnr(img1, img2):
@@ -18,18 +20,28 @@ def compute_psnr(img1, img2):
 
 
 def compute_ssim(img1, img2):
-    gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
-    gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
-    score, _ = ssim(gray1, gray2, full=True)
+    # scikit-image pulls in SciPy, which alone takes longer to import
+    # than the rest of the pipeline; load it on the first SSIM
+    from skimage.metrics import structural_similarity as ssim
+
+    with timer("image.ssim"):
+        gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
+        gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
+        score, _ = ssim(gray1, gray2, full=True)
     return score
 
 
-def evaluate_images(original_path, stego_path):
-    original = cv2.imread(original_path)
-    stego = cv2.imread(stego_path)
-
+def evaluate_arrays(original, stego):
     return {
         "MSE": compute_mse(original, stego),
         "PSNR": compute_psnr(original, stego),
         "SSIM": compute_ssim(original, stego)
     }
+
+
+def evaluate_images(original_path, stego_path):
+    original = load_image(original_path)
+    with timer("image.decode_image"):
+        stego = cv2.imread(stego_path)
+
+    return evaluate_arrays(original, stego)
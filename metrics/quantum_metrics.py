@@ -1,60 +1,145 @@
 # metrics/quantum_metrics.py
 
+from concurrent.futures import as_completed
+
 import numpy as np
+from core.pools import spawn_pool
 from core.qkd import run_qkd_channel
+from core.seeding import keyed_seed
+from metrics.result_cache import result_key
 from multichannel.manager import run_multi_channel_qkd
 
 
-def qber_vs_eve(eve_probs, runs=20, n_qubits=128, noise=0.0):
-    results = {}
-
-    for p in eve_probs:
-        qbers = []
-        for _ in range(runs):
-            res = run_qkd_channel(
-                n_qubits=n_qubits,
-                eve=(np.random.rand() < p),
-                noise=noise
-            )
-            qbers.append(res["qber"])
-
-        results[p] = np.mean(qbers)
-
-    return results
-
-
-def ber_vs_noise(noise_levels, runs=20, n_qubits=128):
-    results = {}
-
-    for noise in noise_levels:
-        qbers = []
-        for _ in range(runs):
-            res = run_qkd_channel(
-                n_qubits=n_qubits,
-                eve=False,
-                noise=noise
-            )
-            qbers.append(res["qber"])
-
-        results[noise] = np.mean(qbers)
-
-    return results
-
-
-def success_rate_vs_channels(channel_counts, runs=20, eve_probability=0.4, noise=0.02):
-    results = {}
-
-    for n in channel_counts:
-        success = 0
-        for _ in range(runs):
-            res = run_multi_channel_qkd(
-                n_channels=n,
-                eve_probability=eve_probability,
-                noise=noise
-            )
-            if res["success"]:
-                success += 1
-
-        results[n] = success / runs
-
-    return results
+def run_sweep_chunk(run_fn, chunk, kwargs):
+    return [(i, j, run_fn(point, run_seed, **kwargs)) for i, j, point, run_seed in chunk]
+
+
+def run_sweep(run_fn, points, runs, seed=None, workers=1, chunksize=1, cache=None,
+              checkpoint=None, **kwargs):
+    """
+    Evaluate run_fn(point, run_seed, **kwargs) for every (point, run)
+    pair and return {point: [value per run]}. Each pair gets its own
+    seed derived from the point value and run index, so the values do
+    not depend on workers, chunksize or which other points are swept.
+    With workers != 1 the pairs are fanned out across a process pool
+    in chunks of chunksize pairs (workers=None uses every core).
+
+    With a ResultCache and a fixed seed, pairs computed by an earlier
+    sweep are read back instead of being simulated again. With a
+    SweepLog checkpoint every finished chunk is logged as it completes,
+    and runs already in the log are skipped, so a killed sweep resumes
+    where it stopped.
+    """
+    if checkpoint is not None and seed is None:
+        raise ValueError("Checkpointed sweeps need a fixed seed to resume")
+
+    tasks = []
+    for i, point in enumerate(points):
+        for j, run_seed in enumerate(keyed_seed(seed, point).spawn(runs)):
+            tasks.append((i, j, point, run_seed))
+
+    values = [[None] * runs for _ in points]
+
+    # Unseeded sweeps never repeat, so there is nothing to reuse
+    keys = {}
+    if (cache is not None or checkpoint is not None) and seed is not None:
+        keys = {(i, j): result_key(run_fn, point, run_seed, kwargs)
+                for i, j, point, run_seed in tasks}
+        done = checkpoint.load() if checkpoint is not None else {}
+        if cache is not None:
+            done.update(cache.get_many([key for key in keys.values() if key not in done]))
+
+        missing = []
+        for i, j, point, run_seed in tasks:
+            if keys[i, j] in done:
+                values[i][j] = done[keys[i, j]]
+            else:
+                missing.append((i, j, point, run_seed))
+        tasks = missing
+
+    def record(computed):
+        for i, j, value in computed:
+            values[i][j] = value
+        if checkpoint is not None:
+            checkpoint.append([{"key": keys[i, j], "point": points[i], "run": j, "value": value}
+                               for i, j, value in computed])
+        if cache is not None and keys:
+            cache.put_many([(keys[i, j], value) for i, j, value in computed])
+
+    chunks = [tasks[k:k + chunksize] for k in range(0, len(tasks), chunksize)]
+    if workers == 1:
+        for chunk in chunks:
+            record(run_sweep_chunk(run_fn, chunk, kwargs))
+    elif chunks:
+        with spawn_pool(workers) as pool:
+            futures = [pool.submit(run_sweep_chunk, run_fn, chunk, kwargs) for chunk in chunks]
+            for future in as_completed(futures):
+                record(future.result())
+
+    return {point: values[i] for i, point in enumerate(points)}
+
+
+def qber_vs_eve_run(p, run_seed, n_qubits=128, noise=0.0, engine="serial", backend="aer"):
+    rng = np.random.default_rng(run_seed)
+    res = run_qkd_channel(
+        n_qubits=n_qubits,
+        eve=(rng.random() < p),
+        noise=noise,
+        engine=engine,
+        backend=backend,
+        seed=rng
+    )
+    return res["qber"]
+
+
+def ber_vs_noise_run(noise, run_seed, n_qubits=128, engine="serial", backend="aer"):
+    res = run_qkd_channel(
+        n_qubits=n_qubits,
+        eve=False,
+        noise=noise,
+        engine=engine,
+        backend=backend,
+        seed=run_seed
+    )
+    return res["qber"]
+
+
+def success_run(n, run_seed, eve_probability=0.4, noise=0.02, engine="serial", backend="aer"):
+    res = run_multi_channel_qkd(
+        n_channels=n,
+        eve_probability=eve_probability,
+        noise=noise,
+        engine=engine,
+        backend=backend,
+        seed=run_seed
+    )
+    return 1 if res["success"] else 0
+
+
+def qber_vs_eve(eve_probs, runs=20, n_qubits=128, noise=0.0, engine="serial", backend="aer",
+                seed=None, workers=1, chunksize=1, cache=None, checkpoint=None):
+    values = run_sweep(qber_vs_eve_run, eve_probs, runs, seed=seed, workers=workers,
+                       chunksize=chunksize, cache=cache, checkpoint=checkpoint,
+                       n_qubits=n_qubits, noise=noise, engine=engine, backend=backend)
+
+    return {p: np.mean(qbers) for p, qbers in values.items()}
+
+
+def ber_vs_noise(noise_levels, runs=20, n_qubits=128, engine="serial", backend="aer", seed=None,
+                 workers=1, chunksize=1, cache=None, checkpoint=None):
+    values = run_sweep(ber_vs_noise_run, noise_levels, runs, seed=seed, workers=workers,
+                       chunksize=chunksize, cache=cache, checkpoint=checkpoint,
+                       n_qubits=n_qubits, engine=engine, backend=backend)
+
+    return {noise: np.mean(qbers) for noise, qbers in values.items()}
+
+
+def success_rate_vs_channels(channel_counts, runs=20, eve_probability=0.4, noise=0.02,
+                             engine="serial", backend="aer", seed=None, workers=1, chunksize=1,
+                             cache=None, checkpoint=None):
+    values = run_sweep(success_run, channel_counts, runs, seed=seed, workers=workers,
+                       chunksize=chunksize, cache=cache, checkpoint=checkpoint,
+                       eve_probability=eve_probability, noise=noise, engine=engine,
+                       backend=backend)
+
+    return {n: sum(successes) / runs for n, successes in values.items()}
@@ -0,0 +1,124 @@
+# metrics/result_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sources whose changes can change a sweep value; editing any of them
+# invalidates every cached result
+CODE_PATHS = ("core", "multichannel", "reconciliation", "privacy", "metrics/quantum_metrics.py")
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    digest = hashlib.sha256()
+    for path in CODE_PATHS:
+        full = os.path.join(ROOT, path)
+        if os.path.isdir(full):
+            files = sorted(
+                os.path.join(directory, name)
+                for directory, _, names in os.walk(full)
+                for name in names if name.endswith(".py")
+            )
+        else:
+            files = [full]
+        for file in files:
+            digest.update(os.path.relpath(file, ROOT).encode())
+            with open(file, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def result_key(run_fn, point, run_seed, kwargs):
+    """
+    Content address of one sweep value: the run function, its parameter
+    point and keyword arguments, the exact seed of the run, and the
+    code version.
+    """
+    identity = {
+        "fn": f"{run_fn.__module__}.{run_fn.__qualname__}",
+        "point": to_json(point),
+        "entropy": str(run_seed.entropy),
+        "spawn_key": list(run_seed.spawn_key),
+        "kwargs": {k: to_json(v) for k, v in sorted(kwargs.items())},
+        "code": code_version()
+    }
+    return hashlib.sha256(json.dumps(identity, sort_keys=True, default=repr).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent store of sweep values in a single SQLite file. Entries are
+    content-addressed by result_key, so extending a sweep with new points
+    or more runs only computes what is missing. When the store grows past
+    max_entries the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=".sweep_cache/results.sqlite", max_entries=500_000):
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self.connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS results "
+                       "(key TEXT PRIMARY KEY, value TEXT, accessed REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    @contextmanager
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are cached."""
+        found = {}
+        now = time.time()
+        with self.connect() as db:
+            # Stay below SQLite's limit on bound parameters
+            for k in range(0, len(keys), 500):
+                batch = keys[k:k + 500]
+                marks = ",".join("?" * len(batch))
+                rows = db.execute(f"SELECT key, value FROM results WHERE key IN ({marks})", batch)
+                found.update((key, json.loads(value)) for key, value in rows)
+            db.executemany("UPDATE results SET accessed = ? WHERE key = ?",
+                           [(now, key) for key in found])
+        return found
+
+    def put_many(self, items):
+        """Store (key, value) pairs, then evict down to max_entries."""
+        now = time.time()
+        with self.connect() as db:
+            db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                           [(key, json.dumps(to_json(value)), now) for key, value in items])
+            excess = db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+            if excess > 0:
+                db.execute("DELETE FROM results WHERE key IN "
+                           "(SELECT key FROM results ORDER BY accessed LIMIT ?)", (excess,))
+
+    def __len__(self):
+        with self.connect() as db:
+            return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self):
+        with self.connect() as db:
+            db.execute("DELETE FROM results")
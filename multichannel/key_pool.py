@@ -0,0 +1,207 @@
+# multichannel/key_pool.py
+
+import threading
+from collections import deque
+
+import numpy as np
+from core.keys import unpack_key
+from multichannel.manager import run_multi_channel_qkd
+
+
+class KeyPool:
+    """
+    Buffer of pre-generated fused keys from run_multi_channel_qkd.
+
+    A background thread refills the pool up to `size` keys whenever it
+    drops below `low_water`, so handing out a key only waits on the
+    simulator when the pool has run dry. Keys and bits are never handed
+    out twice.
+    """
+
+    def __init__(self, size=8, low_water=2, **qkd_options):
+        if not 0 <= low_water < size:
+            raise ValueError("low_water must be between 0 and size - 1")
+
+        self.size = size
+        self.low_water = low_water
+        self.qkd_options = qkd_options
+
+        self.keys = deque()
+        self.leftover_bits = np.zeros(0, dtype=np.uint8)
+        # Lengths of the keys at the end of leftover_bits that no bit has
+        # been handed out from yet
+        self.pending_keys = []
+        self.condition = threading.Condition()
+        self.bits_lock = threading.Lock()
+        self.worker = None
+        self.running = False
+        self.refilling = False
+        self.error = None
+
+        self.stats = {
+            "runs": 0,
+            "failed_runs": 0,
+            "keys_generated": 0,
+            "keys_issued": 0,
+            "bits_issued": 0
+        }
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return self
+            self.running = True
+            self.refilling = True
+            self.error = None
+
+        self.worker = threading.Thread(target=self.refill_loop, daemon=True)
+        self.worker.start()
+        return self
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def available(self):
+        with self.condition:
+            return len(self.keys)
+
+    def wait_full(self, timeout=None):
+        """
+        Block until the pool holds `size` keys, e.g. to warm it up before
+        traffic starts. Returns False if the timeout expired first, and
+        re-raises the error that stopped the refill worker, if any.
+        """
+        with self.condition:
+            full = self.condition.wait_for(
+                lambda: len(self.keys) >= self.size or not self.running, timeout
+            )
+            self.raise_worker_error()
+            return full
+
+    def raise_worker_error(self):
+        # Called with the condition held
+        if self.error is not None:
+            raise RuntimeError("Key pool refill worker failed") from self.error
+
+    def refill_loop(self):
+        while True:
+            with self.condition:
+                while self.running and not self.refilling:
+                    self.condition.wait()
+                if not self.running:
+                    return
+
+            try:
+                result = run_multi_channel_qkd(**self.qkd_options)
+            except Exception as e:
+                # Stop the pool rather than dying silently, so waiting
+                # callers wake up and see the error instead of blocking
+                with self.condition:
+                    self.error = e
+                    self.running = False
+                    self.refilling = False
+                    self.condition.notify_all()
+                return
+
+            with self.condition:
+                self.stats["runs"] += 1
+                if result["success"]:
+                    self.keys.append(result["final_key"])
+                    self.stats["keys_generated"] += 1
+                else:
+                    self.stats["failed_runs"] += 1
+
+                if len(self.keys) >= self.size:
+                    self.refilling = False
+                self.condition.notify_all()
+
+    def get_key(self, timeout=None):
+        """
+        Take one fused key from the pool, waiting up to `timeout`
+        seconds for the background worker if the pool is empty.
+        """
+        key = self.take_key(timeout)
+        with self.condition:
+            self.stats["keys_issued"] += 1
+        return key
+
+    def take_key(self, timeout=None):
+        # get_key without the usage accounting
+        with self.condition:
+            self.raise_worker_error()
+            if not self.running:
+                raise RuntimeError("Key pool is not running")
+
+            if not self.keys and not self.refilling:
+                self.refilling = True
+                self.condition.notify_all()
+
+            if not self.condition.wait_for(lambda: self.keys or not self.running, timeout):
+                raise TimeoutError("No key became available in time")
+            if not self.keys:
+                self.raise_worker_error()
+                raise RuntimeError("Key pool was stopped")
+
+            key = self.keys.popleft()
+
+            if len(self.keys) < self.low_water and not self.refilling:
+                self.refilling = True
+                self.condition.notify_all()
+
+        return key
+
+    def get_bits(self, n_bits, timeout=None):
+        """
+        Take exactly n_bits of key material, concatenating as many
+        pooled keys as needed. Unused bits are kept for the next call.
+        """
+        with self.bits_lock:
+            parts = [self.leftover_bits]
+            lengths = list(self.pending_keys)
+            total = len(self.leftover_bits)
+
+            try:
+                while total < n_bits:
+                    key = unpack_key(self.take_key(timeout))
+                    parts.append(key)
+                    lengths.append(len(key))
+                    total += len(key)
+            except Exception:
+                # Keep the keys taken so far for the next call instead
+                # of dropping key material
+                self.leftover_bits = np.concatenate(parts)
+                self.pending_keys = lengths
+                raise
+
+            bits = np.concatenate(parts)
+            self.leftover_bits = bits[n_bits:]
+
+            # A key counts as issued once its first bit is handed out
+            start = total - sum(lengths)
+            issued = 0
+            while issued < len(lengths) and start < n_bits:
+                start += lengths[issued]
+                issued += 1
+            self.pending_keys = lengths[issued:]
+
+        with self.condition:
+            self.stats["keys_issued"] += issued
+            self.stats["bits_issued"] += n_bits
+
+        return bits[:n_bits]
+
+    def usage(self):
+        with self.condition:
+            return dict(self.stats, available=len(self.keys))
@@ -1,59 +1,268 @@
 # multichannel/manager.py
 
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-import random
-from core.qkd import run_qkd_channel
+from core.instrumentation import count, timer
+from core.keys import PackedKey, truncate_key, unpack_key
+from core.pools import spawn_pool
+from core.qkd import run_qkd_channel, run_qkd_channels
+from core.seeding import spawn_seeds
+from privacy.amplification import privacy_amplify
+from reconciliation.cascade import cascade_reconcile
+
+logger = logging.getLogger(__name__)
+
+
+def stack_words(rows, n_bytes):
+    """
+    Copy byte rows into one zero-padded (len(rows), words) uint64 matrix,
+    each row cut or padded to n_bytes, so every key can be XORed eight
+    bytes at a time in a single reduction.
+    """
+    words = -(-n_bytes // 8)
+    stacked = np.zeros((len(rows), words * 8), dtype=np.uint8)
+    for i, row in enumerate(rows):
+        row = row[:n_bytes]
+        stacked[i, :len(row)] = row
+    return stacked.view(np.uint64)
+
+
+def fuse_keys(keys, trim=True):
+    """
+    XOR-fuse keys without copying every intermediate result. Packed
+    keys are stacked into one uint64 matrix and fused with a single
+    np.bitwise_xor.reduce.
+
+    With trim=True every key is cut to the shortest one, like the
+    original xor_keys. With trim=False the fused key is as long as the
+    longest key (shorter keys are zero-padded), but its bits past the
+    second-longest key come from that one key alone, so they are exposed
+    if its channel was compromised yet accepted.
+
+    All-packed input gives a PackedKey, anything else a uint8 bit array.
+    """
+    lengths = [len(k) for k in keys]
+    length = min(lengths) if trim else max(lengths)
+
+    if all(isinstance(k, PackedKey) for k in keys):
+        n_bytes = (length + 7) // 8
+        fused = np.bitwise_xor.reduce(stack_words([k.data for k in keys], n_bytes), axis=0)
+        # Clears the bits past `length` that longer keys left in the
+        # last byte
+        return truncate_key(PackedKey(fused.view(np.uint8), length), length)
+
+    # Unpacked keys are eight times larger, so stacking them would be
+    # memory-bound; XOR them into one accumulator in place instead
+    fused = np.zeros(length, dtype=np.uint8)
+    for key in keys:
+        bits = unpack_key(key)[:length]
+        np.bitwise_xor(fused[:len(bits)], bits, out=fused[:len(bits)])
+    return fused
+
 
-print("Multi-channel QKD manager module loaded.")
-print("You can run multi-channel QKD simulations with specified parameters.")
 def xor_keys(keys):
     """
     XOR all valid keys (trim to shortest length)
+    Packed keys are XORed byte-wise and give a PackedKey back.
+    """
+    return fuse_keys(keys, trim=True)
+
+
+def finish_channel(channel_id, eve, result, rng, qber_threshold, post_process=False,
+                   elapsed=0.0):
     """
-    min_len = min(len(k) for k in keys)
-    trimmed = [k[:min_len] for k in keys]
+    Channel report and key for one simulated channel. `elapsed` is the
+    simulation time already spent on it; the report's duration adds the
+    post-processing time on top.
+
+    With post_process, an accepted channel's key is reconciled with
+    Cascade and compressed by privacy amplification, and the channel is
+    only kept if some secret key survives.
+    """
+    start = time.perf_counter()
+    channel_data = {
+        "channel_id": channel_id,
+        "eve": eve,
+        "qber": result["qber"],
+        "key_length": result["key_length"],
+        "accepted": result["qber"] < qber_threshold
+    }
+    key = result["alice_key"]
 
-    final_key = trimmed[0].copy()
-    for k in trimmed[1:]:
-        final_key = np.bitwise_xor(final_key, k)
+    if post_process and channel_data["accepted"]:
+        with timer("channel.reconciliation"):
+            reconciled = cascade_reconcile(result["alice_key"], result["bob_key"], result["qber"],
+                                           seed=rng)
+        # After reconciliation Bob holds Alice's bits, so both sides
+        # hash the same key
+        with timer("channel.privacy_amplification"):
+            amplified = privacy_amplify(key, result["qber"], reconciled["leaked_bits"], seed=rng)
+        key = amplified["key"]
+
+        channel_data["leaked_bits"] = reconciled["leaked_bits"]
+        channel_data["secret_key_length"] = amplified["key_length"]
+        channel_data["accepted"] = amplified["key_length"] > 0
+
+    channel_data["duration"] = elapsed + time.perf_counter() - start
+    count("channel.accepted" if channel_data["accepted"] else "channel.rejected")
+    return channel_data, key
+
+
+def evaluate_channel_in_context(context, *args):
+    return context.run(evaluate_channel, *args)
+
+
+def evaluate_channel(channel_id, seed_seq, n_qubits, eve_probability, noise,
+                     qber_threshold, engine, backend, block_size=None, packed=False,
+                     post_process=False):
+    """
+    Evaluate one channel from its own seed sequence, so the result does
+    not depend on which worker runs it or in what order.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed_seq)
+    eve = rng.random() < eve_probability
+    with timer("channel.simulate"):
+        result = run_qkd_channel(
+            n_qubits=n_qubits,
+            eve=eve,
+            noise=noise,
+            engine=engine,
+            backend=backend,
+            seed=rng,
+            qber_threshold=qber_threshold,
+            block_size=block_size,
+            # Only cut compromised channels short, accepted ones keep
+            # their full key for fusion
+            early_stop="above",
+            packed=packed
+        )
+
+    return finish_channel(channel_id, eve, result, rng, qber_threshold, post_process,
+                          time.perf_counter() - start)
+
+
+def evaluate_channels_in_one_job(seed_seqs, n_qubits, eve_probability, noise,
+                                 qber_threshold, packed=False, post_process=False):
+    """
+    Evaluate every channel with the batched engine, submitting all of
+    their circuits to Aer together instead of one job per channel.
+    """
+    start = time.perf_counter()
+    rngs = [np.random.default_rng(seed_seq) for seed_seq in seed_seqs]
+    eves = [rng.random() < eve_probability for rng in rngs]
+    with timer("channel.simulate"):
+        results = run_qkd_channels(eves, n_qubits=n_qubits, noise=noise, seeds=rngs,
+                                   qber_threshold=qber_threshold, packed=packed)
+
+    # The channels share one job, so each is charged an equal share of it
+    share = (time.perf_counter() - start) / max(len(results), 1)
+    return [
+        finish_channel(i, eve, result, rng, qber_threshold, post_process, share)
+        for i, (eve, result, rng) in enumerate(zip(eves, results, rngs))
+    ]
 
-    return final_key
 
-print("XOR keys function is ready.")
-print("You can combine multiple keys using XOR operation.")
 def run_multi_channel_qkd(
         n_channels=3,
         n_qubits=128,
         eve_probability=0.7,
         noise=0.01,
-        qber_threshold=0.110000000000000000000000
+        qber_threshold=0.110000000000000000000000,
+        engine="serial",
+        backend="aer",
+        executor="serial",
+        workers=None,
+        seed=None,
+        block_size=None,
+        packed=False,
+        post_process=False,
+        trim_keys=True
     ):
-    print("Starting multi-channel QKD simulation...")
+    if executor not in ("serial", "thread", "process", "aer"):
+        raise ValueError(f"Unknown executor: {executor}")
+    if executor == "aer" and backend != "aer":
+        raise ValueError("executor='aer' needs backend='aer'")
+    # One Aer job runs every channel, so per-channel engines, blocking and
+    # worker pools do not apply
+    if executor == "aer" and engine != "serial":
+        raise ValueError("executor='aer' does not take an engine")
+    if executor == "aer" and block_size is not None:
+        raise ValueError("executor='aer' does not take a block_size")
+    if executor == "aer" and workers is not None:
+        raise ValueError("executor='aer' does not take workers")
+
+    logger.debug("Starting multi-channel QKD simulation", extra={
+        "n_channels": n_channels, "n_qubits": n_qubits, "executor": executor
+    })
+    seed_seqs = spawn_seeds(seed, n_channels)
+    args = (
+        range(n_channels),
+        seed_seqs,
+        [n_qubits] * n_channels,
+        [eve_probability] * n_channels,
+        [noise] * n_channels,
+        [qber_threshold] * n_channels,
+        [engine] * n_channels,
+        [backend] * n_channels,
+        [block_size] * n_channels,
+        [packed] * n_channels,
+        [post_process] * n_channels
+    )
+
+    if executor == "serial":
+        outcomes = list(map(evaluate_channel, *args))
+    elif executor == "aer":
+        # One Aer job for all channels; Aer parallelises the circuits itself
+        outcomes = evaluate_channels_in_one_job(seed_seqs, n_qubits, eve_probability, noise,
+                                                qber_threshold, packed, post_process)
+    else:
+        task, task_args = evaluate_channel, args
+        if executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=workers)
+            # Worker threads do not inherit contextvars; run every channel
+            # in a copy of the caller's context so an active
+            # instrumentation.recording() sees its stages
+            contexts = [contextvars.copy_context() for _ in seed_seqs]
+            task, task_args = evaluate_channel_in_context, (contexts,) + args
+        else:
+            pool = spawn_pool(workers)
+        # map keeps the results in channel_id order
+        with pool:
+            outcomes = list(pool.map(task, *task_args))
+
+    return fuse_channels(outcomes, trim_keys)
+
+
+def fuse_channels(outcomes, trim_keys=True):
+    """
+    Build the multi-channel report from (channel_data, key) pairs in
+    channel_id order, fusing the keys of every accepted channel (see
+    fuse_keys for trim_keys).
+    """
     channels = []
     valid_keys = []
 
-    for i in range(n_channels):
-        print(f"Evaluating Channel {i+1}...")
-        eve = random.random() < eve_probability
-        result = run_qkd_channel(
-            n_qubits=n_qubits,
-            eve=eve,
-            noise=noise
-        )
-        
-        channel_data = {
-            "channel_id": i,
-            "eve": eve,
-            "qber": result["qber"],
-            "key_length": result["key_length"],
-            "accepted": result["qber"] < qber_threshold
-        }
-
+    for channel_data, key in outcomes:
         channels.append(channel_data)
 
         if channel_data["accepted"]:
-            valid_keys.append(result["alice_key"])
-        print(f"Quantum Channel {i+1} evaluated and reported QBER: {round(result['qber'],4)}")
+            valid_keys.append(key)
+        logger.info("Channel %d evaluated: QBER %.4f, %s", channel_data["channel_id"],
+                    channel_data["qber"], "accepted" if channel_data["accepted"] else "rejected",
+                    extra={
+                        "channel_id": channel_data["channel_id"],
+                        "eve": bool(channel_data["eve"]),
+                        "qber": float(channel_data["qber"]),
+                        "key_length": channel_data["key_length"],
+                        "accepted": bool(channel_data["accepted"]),
+                        "duration": channel_data["duration"]
+                    })
+
     if len(valid_keys) == 0:
         return {
             "success": False,
@@ -62,7 +271,8 @@ def run_multi_channel_qkd(
             "final_key": None
         }
     
-    final_key = xor_keys(valid_keys)
+    with timer("multichannel.fusion"):
+        final_key = fuse_keys(valid_keys, trim=trim_keys)
     
     return {
         "success": True,
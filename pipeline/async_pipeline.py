@@ -0,0 +1,90 @@
+# pipeline/async_pipeline.py
+
+import asyncio
+from functools import partial
+
+from core.seeding import spawn_seeds
+from crypto.encryption import encrypt_message, decrypt_message
+from multichannel.manager import evaluate_channel, fuse_channels
+from stego.lsb import load_image, embed_array, extract_array
+
+
+# Every CPU-heavy step runs in `executor` (None means the loop's default
+# thread pool). Aer, OpenCV, NumPy and AES all release the GIL, so many
+# sessions can be in flight without blocking the event loop.
+
+async def run_blocking(executor, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+
+
+async def evaluate_channel_async(channel_id, seed_seq, n_qubits=128, eve_probability=0.7,
+                                 noise=0.01, qber_threshold=0.11, engine="serial",
+                                 backend="aer", block_size=None, executor=None):
+    return await run_blocking(executor, evaluate_channel, channel_id, seed_seq, n_qubits,
+                              eve_probability, noise, qber_threshold, engine, backend,
+                              block_size)
+
+
+async def run_multi_channel_qkd_async(n_channels=3, n_qubits=128, eve_probability=0.7,
+                                      noise=0.01, qber_threshold=0.11, engine="serial",
+                                      backend="aer", seed=None, block_size=None,
+                                      trim_keys=True, executor=None):
+    """
+    Async run_multi_channel_qkd: every channel is evaluated concurrently
+    and the result has the same structure, channels in channel_id order.
+    """
+    outcomes = await asyncio.gather(*(
+        evaluate_channel_async(i, seed_seq, n_qubits, eve_probability, noise,
+                               qber_threshold, engine, backend, block_size, executor)
+        for i, seed_seq in enumerate(spawn_seeds(seed, n_channels))
+    ))
+    return fuse_channels(outcomes, trim_keys)
+
+
+async def encrypt_async(message, quantum_key, executor=None):
+    return await run_blocking(executor, encrypt_message, message, quantum_key)
+
+
+async def decrypt_async(ciphertext, iv, quantum_key, executor=None):
+    return await run_blocking(executor, decrypt_message, ciphertext, iv, quantum_key)
+
+
+async def embed_async(cover, payload, executor=None):
+    return await run_blocking(executor, embed_array, cover, payload)
+
+
+async def extract_async(stego, data_length, executor=None):
+    return await run_blocking(executor, extract_array, stego, data_length)
+
+
+async def run_session(message, cover_path="assets/cover.png", executor=None, **qkd_options):
+    """
+    Full sender/receiver flow for one message: multi-channel QKD, AES
+    encryption, LSB embedding, then extraction and decryption. Returns
+    the QKD report plus the stego image and recovered message, or just
+    the report if every channel was compromised.
+    """
+    result = await run_multi_channel_qkd_async(executor=executor, **qkd_options)
+    if not result["success"]:
+        return {"qkd": result, "success": False}
+
+    final_key = result["final_key"]
+    encrypted = await encrypt_async(message, final_key, executor)
+    payload = encrypted["iv"] + encrypted["ciphertext"]
+
+    cover = await run_blocking(executor, load_image, cover_path)
+    if cover is None:
+        raise ValueError("Image not found")
+    stego = await embed_async(cover, payload, executor)
+
+    extracted = await extract_async(stego, len(payload), executor)
+    decrypted = await decrypt_async(extracted[16:], extracted[:16], final_key, executor)
+
+    return {
+        "qkd": result,
+        "success": True,
+        "payload_size": len(payload),
+        "stego": stego,
+        "decrypted": decrypted
+    }
@@ -0,0 +1,67 @@
+# privacy/amplification.py
+
+import numpy as np
+from core.keys import PackedKey, pack_key, unpack_key
+
+EPSILON = 1e-10
+
+
+def binary_entropy(p):
+    if p <= 0 or p >= 1:
+        return 0.0
+    return float(-p * np.log2(p) - (1 - p) * np.log2(1 - p))
+
+
+def secure_key_length(n_bits, qber, leaked_bits, epsilon=EPSILON):
+    """
+    Length of the final key after privacy amplification: the n_bits
+    reconciled bits, minus what Eve learns from the channel (n * h(qber)),
+    minus the parities disclosed during reconciliation, minus the
+    2 * log2(1 / epsilon) security margin of the leftover hash lemma.
+    """
+    length = n_bits * (1 - binary_entropy(qber)) - leaked_bits - 2 * np.log2(1 / epsilon)
+    return max(0, int(np.floor(length)))
+
+
+def toeplitz_hash(bits, toeplitz_seed, out_len):
+    """
+    Multiply the key by the out_len x n Toeplitz matrix whose first row
+    and column come from toeplitz_seed (n + out_len - 1 bits), mod 2.
+    Row i of the product is entry i + n - 1 of the convolution of the
+    seed with the key, so it is computed with one real FFT in
+    O((n + m) log(n + m)) instead of the O(n * m) matrix product.
+    """
+    n = len(bits)
+    if out_len == 0 or n == 0:
+        return np.zeros(out_len, dtype=np.uint8)
+
+    size = n + len(toeplitz_seed) - 1
+    fft_len = 1 << (size - 1).bit_length()
+    product = np.fft.irfft(np.fft.rfft(toeplitz_seed, fft_len) * np.fft.rfft(bits, fft_len), fft_len)
+
+    # Every convolution entry is an integer count of at most n ones, so
+    # rounding recovers it exactly before taking the parity
+    counts = np.rint(product[n - 1:n - 1 + out_len]).astype(np.int64)
+    return (counts & 1).astype(np.uint8)
+
+
+def privacy_amplify(key, qber, leaked_bits, epsilon=EPSILON, seed=None):
+    """
+    Compress a reconciled key to secure_key_length bits with a random
+    Toeplitz hash. The Toeplitz seed is public and returned so the
+    other side can apply the same hash to its copy of the key.
+    """
+    packed = isinstance(key, PackedKey)
+    bits = unpack_key(key)
+    n = len(bits)
+    out_len = secure_key_length(n, qber, leaked_bits, epsilon)
+
+    rng = np.random.default_rng(seed)
+    toeplitz_seed = rng.integers(2, size=n + out_len - 1 if out_len else 0, dtype=np.uint8)
+    amplified = toeplitz_hash(bits, toeplitz_seed, out_len)
+
+    return {
+        "key": pack_key(amplified) if packed else amplified,
+        "key_length": out_len,
+        "toeplitz_seed": toeplitz_seed
+    }
@@ -1,49 +1,97 @@
 # stego/lsb.py
 
+import os
+from functools import lru_cache
+
 import cv2
 import numpy as np
+from core.instrumentation import count, timer
 
 
 def bytes_to_bits(data):
-    bits = []
-    for byte in data:
-        bits.extend([int(b) for b in format(byte, '08b')])
-    return bits
+    return np.unpackbits(np.frombuffer(bytes(data), dtype=np.uint8))
 
 
 def bits_to_bytes(bits):
-    bytes_list = []
-    for i in range(0, len(bits), 8):
-        byte = bits[i:i+8]
-        bytes_list.append(int("".join(map(str, byte)), 2))
-    return bytes(bytes_list)
+    return np.packbits(np.asarray(bits, dtype=np.uint8)).tobytes()
 
 
-def embed_data(image_path, data, output_path):
-    image = cv2.imread(image_path)
+@lru_cache(maxsize=16)
+def read_image_cached(image_path, mtime):
+    # Only runs on a cache miss, so this times real decodes
+    with timer("lsb.decode_image"):
+        image = cv2.imread(image_path)
+    if image is not None:
+        # Shared between callers, so nobody may modify it in place
+        image.setflags(write=False)
+    return image
+
+
+def load_image(image_path):
+    """
+    Decoded image from disk, cached by path and modification time so a
+    cover image is decoded once however many messages it carries.
+    Returns None if the image does not exist or cannot be read.
+    """
+    try:
+        mtime = os.path.getmtime(image_path)
+    except OSError:
+        return None
+    return read_image_cached(image_path, mtime)
+
+
+def encode_image(image, ext=".png"):
+    ok, buffer = cv2.imencode(ext, image)
+    if not ok:
+        raise ValueError(f"Could not encode image as {ext}")
+    return buffer.tobytes()
+
+
+def decode_image(data):
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
     if image is None:
-        raise ValueError("Image not found")
+        raise ValueError("Could not decode image")
+    return image
 
-    flat = image.flatten()
-    bits = bytes_to_bits(data)
 
-    if len(bits) > len(flat):
-        raise ValueError("Data too large to embed")
+def embed_array(image, data):
+    """
+    Return a copy of image with data written into the pixel LSBs.
+    """
+    with timer("lsb.embed"):
+        flat = image.flatten()
+        bits = bytes_to_bits(data)
 
-    for i in range(len(bits)):
-        flat[i] = (flat[i] & 0b11111110) | bits[i]
+        if len(bits) > len(flat):
+            raise ValueError("Data too large to embed")
 
-    stego = flat.reshape(image.shape)
-    cv2.imwrite(output_path, stego)
-    return output_path
+        flat[:len(bits)] = (flat[:len(bits)] & 0b11111110) | bits
+    count("lsb.bytes_embedded", len(data))
 
+    return flat.reshape(image.shape)
 
-def extract_data(image_path, data_length):
-    image = cv2.imread(image_path)
-    flat = image.flatten()
 
-    bits = []
-    for i in range(data_length * 8):
-        bits.append(flat[i] & 1)
+def extract_array(image, data_length):
+    with timer("lsb.extract"):
+        flat = image.reshape(-1)
 
-    return bits_to_bytes(bits)
+        bits = flat[:data_length * 8] & 1
+
+        return bits_to_bytes(bits)
+
+
+def embed_data(image_path, data, output_path):
+    image = load_image(image_path)
+    if image is None:
+        raise ValueError("Image not found")
+
+    stego = embed_array(image, data)
+    with timer("lsb.write_image"):
+        cv2.imwrite(output_path, stego)
+    return output_path
+
+
+def extract_data(image_path, data_length):
+    with timer("lsb.decode_image"):
+        image = cv2.imread(image_path)
+    return extract_array(image, data_length)
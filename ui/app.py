@@ -64,7 +64,8 @@ if run_button:
             n_channels=n_channels,
             n_qubits=n_qubits,
             eve_probability=eve_prob,
-            noise=noise
+            noise=noise,
+            executor="thread"
         )
 
     log("✔ Quantum transmission completed")
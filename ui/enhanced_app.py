@@ -4,10 +4,11 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 import streamlit as st
 import pandas as pd
 
+from core import instrumentation
 from multichannel.manager import run_multi_channel_qkd
 from crypto.encryption import encrypt_message, decrypt_message
-from stego.lsb import embed_data, extract_data
-from metrics.image_metrics import evaluate_images
+from stego.lsb import load_image, encode_image, embed_array, extract_array
+from metrics.image_metrics import evaluate_arrays
 
 
 st.set_page_config(page_title="Quantum Secure Communication Simulator", layout="wide")
@@ -49,10 +50,10 @@ def log(msg):
 
 # ---------------- RUN SIMULATION ----------------
 
-if run_button:
+def run_simulation(recorder):
     # Clear previous logs
     st.session_state.logs = []
-    
+
     st.divider()
     log("### 🔹 Stage 1: Initializing quantum communication layer")
     log("- Setting up BB84 protocol")
@@ -68,7 +69,8 @@ if run_button:
             n_channels=n_channels,
             n_qubits=n_qubits,
             eve_probability=eve_prob,
-            noise=noise
+            noise=noise,
+            executor="thread"
         )
 
     log("✔ Quantum transmission completed\n")
@@ -127,25 +129,28 @@ if run_button:
     log("- Generating stego image")
 
     cover_path = "assets/cover.png"
-    stego_path = "assets/stego_ui.png"
 
-    # Check if cover image exists
-    if not os.path.exists(cover_path):
+    # Decoded once per file version and shared across sessions
+    cover = load_image(cover_path)
+    if cover is None:
         st.error(f"❌ Cover image not found at {cover_path}")
         st.info("Please ensure the cover image exists in the assets directory")
         st.stop()
 
+    # The stego image stays in memory, so sessions never share a file
     try:
-        _ = embed_data(cover_path, payload, stego_path)
+        stego = embed_array(cover, payload)
     except Exception as e:
         st.error(f"❌ Error during steganographic embedding: {str(e)}")
         st.stop()
 
     col1, col2 = st.columns(2)
     with col1:
-        st.image(cover_path, caption="Original Image")
+        st.image(cover, caption="Original Image", channels="BGR")
     with col2:
-        st.image(stego_path, caption="Stego Image")
+        st.image(stego, caption="Stego Image", channels="BGR")
+        st.download_button("Download stego image", encode_image(stego),
+                           file_name="stego.png", mime="image/png")
 
     # ---------------- Receiver ----------------
 
@@ -153,7 +158,7 @@ if run_button:
     log("- Extracting hidden payload from image")
 
     try:
-        extracted = extract_data(stego_path, len(payload))
+        extracted = extract_array(stego, len(payload))
         iv = extracted[:16]
         ciphertext = extracted[16:]
 
@@ -173,7 +178,7 @@ if run_button:
     st.subheader("📊 Steganography Quality Metrics")
 
     try:
-        metrics = evaluate_images(cover_path, stego_path)
+        metrics = evaluate_arrays(cover, stego)
 
         c1, c2, c3 = st.columns(3)
         c1.metric("SSIM", round(metrics["SSIM"], 6))
@@ -183,4 +188,43 @@ if run_button:
         st.warning(f"⚠️ Could not calculate image metrics: {str(e)}")
 
     log("\n### 🔹 Stage 7: System verification complete")
-    log("✔ Secure communication achieved across all three layers")
\ No newline at end of file
+    log("✔ Secure communication achieved across all three layers")
+
+    # ---------------- Performance ----------------
+
+    st.subheader("⏱️ Stage Timing Breakdown")
+
+    stats = instrumentation.snapshot(recorder)
+    timings = pd.DataFrame([
+        {
+            "Stage": name,
+            "Calls": timing["calls"],
+            "Total (ms)": timing["total_seconds"] * 1e3,
+            "Mean (ms)": timing["mean_seconds"] * 1e3,
+            "Max (ms)": timing["max_seconds"] * 1e3
+        }
+        for name, timing in stats["timings"].items()
+    ])
+
+    if timings.empty:
+        st.info("No stage timings were recorded")
+    else:
+        timings = timings.sort_values("Total (ms)", ascending=False)
+        st.bar_chart(timings.set_index("Stage")["Total (ms)"])
+        st.dataframe(timings, use_container_width=True)
+        st.caption("Channels run on worker threads, so stage totals can exceed wall time.")
+
+    with st.expander("Counters and exports"):
+        st.json(stats["counters"])
+        c1, c2 = st.columns(2)
+        c1.download_button("Download JSON", instrumentation.to_json(recorder=recorder),
+                           file_name="stage_timings.json", mime="application/json")
+        c2.download_button("Download Prometheus text", instrumentation.to_prometheus(recorder=recorder),
+                           file_name="stage_timings.prom", mime="text/plain")
+
+
+if run_button:
+    # Stage timings go to a recorder private to this run, so concurrent
+    # sessions never reset or mix each other's breakdown
+    with instrumentation.recording() as recorder:
+        run_simulation(recorder)